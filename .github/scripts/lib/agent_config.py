@@ -18,6 +18,7 @@ Usage:
 # TODO use pydantic settings instead of yaml parsing
 
 import logging
+import os
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -26,6 +27,9 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+# libyaml-backed loader when PyYAML was built with it, pure Python otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Canonical location: .github/agent_config.yml
 _CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "agent_config.yml"
 
@@ -66,7 +70,6 @@ class AgentConfig:
     timeouts: Timeouts
 
 
-@lru_cache(maxsize=1)
 def load_config(config_path: Path = _CONFIG_PATH) -> AgentConfig:
     """Load and parse agent_config.yml, caching the result.
 
@@ -81,16 +84,20 @@ def load_config(config_path: Path = _CONFIG_PATH) -> AgentConfig:
         KeyError: If a required key is missing from the config file.
         ValueError: If a value has the wrong type.
     """
-    config_path = Path(config_path)
+    # Normalise the cache key so load_config(), load_config(_CONFIG_PATH) and
+    # a relative str path all hit the same entry. abspath does no I/O.
+    return _load_config(Path(os.path.abspath(config_path)))
+
 
+@lru_cache(maxsize=4)
+def _load_config(config_path: Path) -> AgentConfig:
     if not config_path.exists():
         raise FileNotFoundError(
             f"Agent config not found at {config_path}. "
             "Expected .github/agent_config.yml to exist in the repository root."
         )
 
-    with config_path.open(encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
+    raw = yaml.load(config_path.read_bytes(), Loader=_YamlLoader)
 
     logger.debug(f"Loaded agent config from {config_path}")
 
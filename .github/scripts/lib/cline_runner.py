@@ -5,18 +5,21 @@ models, MCP settings, and command permissions. All failures are raised
 explicitly — never silently swallowed.
 """
 
+import codecs
+import http.client
+import io
 import json
 import logging
 import os
+import re
+import select
 import shutil
 import subprocess
 import threading
 import time as _time
-import urllib.request
-import urllib.error
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -30,27 +33,149 @@ _STUCK_PATTERNS = [
     "waiting for approval",
     "Please run 'cline auth'",
 ]
+_STUCK_RE = re.compile("|".join(map(re.escape, _STUCK_PATTERNS)), re.IGNORECASE)
 
+# How often a running Cline logs a liveness/spend line
+_HEARTBEAT_SECONDS = 30
 
-def get_openrouter_usage() -> Optional[float]:
+# Bytes taken from a Cline pipe per read
+_READ_CHUNK_BYTES = 65536
+
+# Credentials Cline never needs: it has no gh permission and pushes nothing,
+# so these are kept out of the environment it, and every command it runs, sees
+_CHILD_ENV_DROP = frozenset(
+    {
+        "GITHUB_TOKEN",
+        "GH_TOKEN",
+        "ACTIONS_RUNTIME_TOKEN",
+        "ACTIONS_ID_TOKEN_REQUEST_TOKEN",
+    }
+)
+
+# Linux rejects any single argv string over 128 KiB (MAX_ARG_STRLEN) with
+# E2BIG; prompts at or above this size go to Cline on stdin instead
+_ARGV_PROMPT_MAX_BYTES = 128 * 1024
+
+
+def _iter_line_batches(stream) -> Iterator[list[str]]:
+    """Yield the complete lines (without line endings) from each pipe read.
+
+    Each ``read1`` takes whatever the pipe has buffered, up to
+    _READ_CHUNK_BYTES, and decodes it in one go, instead of one readline
+    per line. Line endings are normalised the way text-mode pipes do
+    (``\\r\\n`` and lone ``\\r`` both end a line).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = stream.read1(_READ_CHUNK_BYTES)
+        text = pending + decoder.decode(chunk, final=not chunk)
+        # A trailing \r may be the first half of a \r\n split across reads
+        hold_cr = bool(chunk) and text.endswith("\r")
+        if hold_cr:
+            text = text[:-1]
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        pending = lines.pop()
+        if not chunk and pending:
+            lines.append(pending)
+        if lines:
+            yield lines
+        if not chunk:
+            break
+        if hold_cr:
+            pending += "\r"
+
+
+def _feed_stdin(stream, data: bytes) -> None:
+    """Write data to a child's stdin and close it; a child that exits early is fine."""
+    try:
+        with stream:
+            stream.write(data)
+    except BrokenPipeError:
+        pass
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """Return a pidfd that becomes readable when ``pid`` exits, if supported.
+
+    Needs Linux 5.3+ and Python 3.9+. Returns None anywhere else, and the
+    caller falls back to sleeping between ``poll()`` checks.
+    """
+    pidfd_open = getattr(os, "pidfd_open", None)
+    # Popen.pid is always an int; anything else (a test double) has no
+    # process behind it to watch
+    if pidfd_open is None or not isinstance(pid, int):
+        return None
+    try:
+        return pidfd_open(pid)
+    except (OSError, TypeError):
+        return None
+
+
+_OPENROUTER_HOST = "openrouter.ai"
+_OPENROUTER_KEY_PATH = "/api/v1/key"
+# Heartbeats and cost sections only need delta resolution; reuse a reading
+# this fresh instead of making another round-trip
+_USAGE_TTL_SECONDS = 5.0
+
+# One keep-alive HTTPS connection per process, so heartbeats don't pay a
+# TCP+TLS handshake each time. Shared by all runner threads under the lock.
+_usage_lock = threading.Lock()
+_usage_conn: Optional[http.client.HTTPSConnection] = None
+_usage_cache: Optional[tuple[str, float, float]] = None  # (api_key, fetched_at, usage)
+
+
+def _fetch_openrouter_usage(api_key: str) -> Optional[float]:
+    """GET the key endpoint on the shared connection. Caller holds _usage_lock."""
+    global _usage_conn
+    headers = {"Authorization": f"Bearer {api_key}"}
+    # A kept-alive connection the server has since closed fails on first
+    # use; retry once on a fresh one
+    for attempt in range(2):
+        if _usage_conn is None:
+            _usage_conn = http.client.HTTPSConnection(_OPENROUTER_HOST, timeout=10)
+        try:
+            _usage_conn.request("GET", _OPENROUTER_KEY_PATH, headers=headers)
+            resp = _usage_conn.getresponse()
+            body = resp.read()
+            break
+        except (OSError, http.client.HTTPException):
+            _usage_conn.close()
+            _usage_conn = None
+            if attempt:
+                raise
+    if resp.status != 200:
+        logger.debug(f"OpenRouter usage check returned HTTP {resp.status}")
+        return None
+    return json.loads(body).get("data", {}).get("usage")
+
+
+def get_openrouter_usage(fresh: bool = False) -> Optional[float]:
     """Query OpenRouter API for current usage (credits consumed in USD).
 
-    Returns the usage value, or None if the API call fails.
+    Readings are reused for _USAGE_TTL_SECONDS, unless ``fresh`` is set:
+    a final reading taken soon after its baseline must not reuse it, or the
+    cost comes out as zero. Returns the usage value, or None if the API
+    call fails.
     """
+    global _usage_cache
     api_key = os.environ.get("OPENROUTER_API_KEY")
     if not api_key:
         return None
-    try:
-        req = urllib.request.Request(
-            "https://openrouter.ai/api/v1/key",
-            headers={"Authorization": f"Bearer {api_key}"},
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            return data.get("data", {}).get("usage")
-    except Exception as e:
-        logger.debug(f"OpenRouter usage check failed: {e}")
-        return None
+    with _usage_lock:
+        now = _time.monotonic()
+        if _usage_cache is not None and not fresh:
+            cached_key, fetched_at, usage = _usage_cache
+            if cached_key == api_key and now - fetched_at < _USAGE_TTL_SECONDS:
+                return usage
+        try:
+            usage = _fetch_openrouter_usage(api_key)
+        except Exception as e:
+            logger.debug(f"OpenRouter usage check failed: {e}")
+            return None
+        if usage is not None:
+            _usage_cache = (api_key, now, usage)
+        return usage
 
 
 # Keep private alias for backward compatibility
@@ -77,6 +202,8 @@ class ClineResult:
     stderr: str
     exit_code: int
     cost_usd: Optional[float] = None
+    # First stdout line matching the ``marker`` passed to ``run()``, if any
+    marker_line: Optional[str] = None
 
     @property
     def success(self) -> bool:
@@ -143,6 +270,33 @@ READ_ONLY_PERMISSIONS = {
     "allowRedirects": False,
 }
 
+# globalState.json layout; json.dumps(indent=2) would build this encoder per call
+_encode_state = json.JSONEncoder(indent=2).encode
+
+
+def _write_if_changed(path: Path, data: bytes, mode: Optional[int] = None) -> bool:
+    """Write data to path unless the file already holds exactly those bytes.
+
+    With ``mode``, the file is created with (or narrowed to) those
+    permissions before any data goes in.
+    """
+    try:
+        if path.read_bytes() == data:
+            if mode is not None:
+                os.chmod(path, mode)
+            return False
+    except FileNotFoundError:
+        pass
+    if mode is None:
+        path.write_bytes(data)
+        return True
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with open(fd, "wb") as f:
+        # O_CREAT's mode only applies to a new file; narrow an old one too
+        os.fchmod(fd, mode)
+        f.write(data)
+    return True
+
 
 class ClineRunner:
     """Manages Cline CLI invocations with isolated config directories."""
@@ -172,6 +326,8 @@ class ClineRunner:
         self.plan_model = plan_model or model
         self.mcp_settings_path = mcp_settings_path
         self.command_permissions = command_permissions or DEFAULT_COMMAND_PERMISSIONS
+        # Fixed for the runner's lifetime, so encoded once rather than per run
+        self._permissions_env = json.dumps(self.command_permissions)
 
         # Verify cline is installed
         if not shutil.which("cline"):
@@ -188,19 +344,18 @@ class ClineRunner:
         data_dir = self.cline_dir / "data"
         data_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy MCP settings if provided — always overwrite so changes take effect on re-runs
+        # Copy MCP settings if provided, rewriting only on change. A copy, not
+        # a link: Cline owns this file, and its writes must not reach the repo.
         # CLI expects: <CLINE_DIR>/data/settings/cline_mcp_settings.json
         if self.mcp_settings_path and self.mcp_settings_path.exists():
             settings_dir = data_dir / "settings"
             settings_dir.mkdir(parents=True, exist_ok=True)
             dest = settings_dir / "cline_mcp_settings.json"
-            import shutil as sh
-
-            sh.copy2(self.mcp_settings_path, dest)
-            logger.debug(f"Copied MCP settings to {dest}")
+            self._copy_mcp_settings(dest)
 
         # Write auth config so Cline doesn't prompt interactively.
-        # Always overwrite so model changes and key rotations take effect.
+        # Checked on every init so model changes and key rotations take effect;
+        # a file that already matches is left alone.
         #
         # For OpenRouter, Cline uses provider-specific model ID keys:
         #   actModeOpenRouterModelId / planModeOpenRouterModelId
@@ -216,21 +371,45 @@ class ClineRunner:
             "planModeApiProvider": "openrouter",
             "planModeOpenRouterModelId": self.plan_model,
         }
-        global_state.write_text(json.dumps(state, indent=2), encoding="utf-8")
-        logger.debug(f"Wrote globalState.json to {global_state}")
+        if _write_if_changed(global_state, _encode_state(state).encode("utf-8")):
+            logger.debug(f"Wrote globalState.json to {global_state}")
 
         if api_key:
             secrets_file = data_dir / "secrets.json"
-            secrets_file.write_text(
-                json.dumps({"openRouterApiKey": api_key}), encoding="utf-8"
-            )
-            logger.debug(f"Wrote secrets.json to {secrets_file}")
+            secrets = json.dumps({"openRouterApiKey": api_key}).encode("utf-8")
+            # Owner-only: the file holds the OpenRouter key
+            if _write_if_changed(secrets_file, secrets, mode=0o600):
+                logger.debug(f"Wrote secrets.json to {secrets_file}")
+
+    def _copy_mcp_settings(self, dest: Path) -> None:
+        src = self.mcp_settings_path
+        try:
+            # A hardlink left by an older run would write through to src
+            if os.path.samefile(src, dest):
+                dest.unlink()
+        except FileNotFoundError:
+            pass
+        if _write_if_changed(dest, src.read_bytes()):
+            logger.debug(f"Copied MCP settings to {dest}")
+
+    def reset_task_state(self) -> None:
+        """Clear Cline's task history so the next run starts from a clean slate.
+
+        Only ``<cline_dir>/data/tasks`` is removed; the config written by
+        ``_setup_cline_dir`` is kept, so one runner can be reused across runs
+        without redoing its directory setup.
+        """
+        tasks_dir = self.cline_dir / "data" / "tasks"
+        if tasks_dir.exists():
+            shutil.rmtree(tasks_dir)
+            logger.debug(f"Cleared task state in {tasks_dir}")
 
     def run(
         self,
         prompt: str,
         timeout: int = 600,
         cwd: Optional[Path] = None,
+        marker: Optional[str] = None,
     ) -> ClineResult:
         """Run Cline CLI in YOLO mode with the given prompt.
 
@@ -238,9 +417,12 @@ class ClineRunner:
             prompt: The task prompt to send to Cline.
             timeout: Max execution time in seconds.
             cwd: Working directory for Cline. Defaults to current dir.
+            marker: Optional regex (case-insensitive). The first stdout line
+                matching it is recorded as ``ClineResult.marker_line`` while
+                output streams, so callers need not rescan the full stdout.
 
         Returns:
-            ClineResult with stdout, stderr, and exit code.
+            ClineResult with stdout, stderr, exit code, and marker line.
 
         Raises:
             ClineError: If Cline fails or times out.
@@ -266,11 +448,15 @@ class ClineRunner:
         if cwd:
             cmd.extend(["-c", str(cwd)])
 
-        cmd.append(prompt)
+        # Huge prompts (large embedded diffs) can't go on the command line
+        prompt_bytes = prompt.encode("utf-8")
+        pipe_prompt = len(prompt_bytes) >= _ARGV_PROMPT_MAX_BYTES
+        if not pipe_prompt:
+            cmd.append(prompt)
 
-        env = os.environ.copy()
+        env = {k: v for k, v in os.environ.items() if k not in _CHILD_ENV_DROP}
         env["CLINE_DIR"] = str(self.cline_dir)
-        env["CLINE_COMMAND_PERMISSIONS"] = json.dumps(self.command_permissions)
+        env["CLINE_COMMAND_PERMISSIONS"] = self._permissions_env
 
         logger.info(
             f"Running Cline (act={self.model}, plan={self.plan_model}, timeout={timeout}s)"
@@ -278,124 +464,192 @@ class ClineRunner:
         logger.debug(f"CLINE_DIR={self.cline_dir}")
         logger.debug(f"Prompt length: {len(prompt)} chars")
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        # Each stream is written only by its own reader thread; the line
+        # count feeds the heartbeat
+        stdout_buf = io.StringIO()
+        stderr_buf = io.StringIO()
+        line_counts = {"stdout": 0, "stderr": 0}
         stuck_reason: Optional[str] = None
+        marker_line: Optional[str] = None
+        marker_re = re.compile(marker, re.IGNORECASE) if marker else None
         lock = threading.Lock()
+        # Readers write here to wake the wait loop as soon as Cline looks stuck.
+        # wake_open (guarded by lock) stops a late reader writing after close.
+        wake_r, wake_w = os.pipe()
+        wake_open = True
 
-        def _reader(stream, lines: list[str], label: str) -> None:
+        def _reader(stream, buf: io.StringIO, label: str) -> None:
             """Read lines from a stream in a background thread."""
-            nonlocal stuck_reason
-            for raw in stream:
-                line = raw.rstrip("\n")
-                lines.append(line)
+            nonlocal stuck_reason, marker_line
+            watch_marker = marker_re is not None and label == "stdout"
+            prefix = f"[cline {label}] "
+            for batch in _iter_line_batches(stream):
+                # Same text "\n".join(all lines) would give, without the list
+                if line_counts[label]:
+                    buf.write("\n")
+                buf.write("\n".join(batch))
+                line_counts[label] += len(batch)
+                stuck = None
+                for seen, line in enumerate(batch, 1):
+                    if watch_marker and marker_re.search(line):
+                        marker_line = line
+                        watch_marker = False
+                    # Check for patterns that indicate Cline is stuck
+                    stuck = _STUCK_RE.search(line)
+                    if stuck:
+                        break
                 # Both stdout and stderr carry live Cline activity:
                 # - stderr: task lifecycle events (Task started, tool calls, errors)
                 # - stdout: tool results, file edits, command output
                 # Log both at INFO so the full agent activity is visible in CI logs.
-                if line.strip():
-                    logger.info(f"[cline {label}] {line}")
-                # Check for patterns that indicate Cline is stuck
-                for pattern in _STUCK_PATTERNS:
-                    if pattern.lower() in line.lower():
-                        with lock:
-                            stuck_reason = (
-                                f"Detected stuck pattern: '{pattern}' in: {line}"
-                            )
-                        return  # stop reading, main loop will kill
+                # One record per pipe read rather than per line; every line
+                # keeps its prefix so the CI log still greps the same way.
+                shown = [prefix + line for line in batch[:seen] if line.strip()]
+                if shown:
+                    logger.info("\n".join(shown))
+                if stuck:
+                    with lock:
+                        stuck_reason = (
+                            f"Detected stuck pattern: '{stuck.group(0)}' in: {line}"
+                        )
+                        if wake_open:
+                            os.write(wake_w, b"x")
+                    return  # stop reading, main loop will kill
 
         try:
+            # No preexec_fn/user/group here: that keeps CPython launching the
+            # child via vfork instead of fork, so the parent's page tables are
+            # never copied, however much it has in memory
             proc = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE if pipe_prompt else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
                 env=env,
                 cwd=str(cwd) if cwd else None,
             )
+            if pipe_prompt:
+                logger.debug("Prompt too long for argv, sending it on stdin")
+                threading.Thread(
+                    target=_feed_stdin, args=(proc.stdin, prompt_bytes), daemon=True
+                ).start()
 
             # Stream stdout/stderr via background threads so neither blocks
             t_out = threading.Thread(
-                target=_reader, args=(proc.stdout, stdout_lines, "stdout"), daemon=True
+                target=_reader, args=(proc.stdout, stdout_buf, "stdout"), daemon=True
             )
             t_err = threading.Thread(
-                target=_reader, args=(proc.stderr, stderr_lines, "stderr"), daemon=True
+                target=_reader, args=(proc.stderr, stderr_buf, "stderr"), daemon=True
             )
             t_out.start()
             t_err.start()
 
-            # Snapshot OpenRouter usage baseline for per-run spend tracking
-            last_usage = _get_openrouter_usage()
-            run_baseline = last_usage  # account total at process start
+            # Block until the child exits, a reader flags a stuck pattern, or
+            # the next heartbeat/deadline is due, instead of waking every second
+            pidfd = _open_pidfd(proc.pid)
+            poller = None
+            if pidfd is not None:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                poller.register(wake_r, select.POLLIN)
+
+            # Snapshot OpenRouter usage baseline for per-run spend tracking.
+            # It is a network round trip, so it is fetched while Cline starts
+            # up and only waited for once a heartbeat or the final cost needs it
+            baseline: list[Optional[float]] = []
+            baseline_thread: Optional[threading.Thread] = threading.Thread(
+                target=lambda: baseline.append(_get_openrouter_usage()), daemon=True
+            )
+            baseline_thread.start()
+            last_usage: Optional[float] = None
+            run_baseline: Optional[float] = None  # account total at process start
+
+            def _await_baseline() -> None:
+                nonlocal baseline_thread, last_usage, run_baseline
+                if baseline_thread is not None:
+                    baseline_thread.join()
+                    baseline_thread = None
+                    last_usage = run_baseline = baseline[0] if baseline else None
 
             # Wait for process, checking for stuck/timeout
-            deadline = _time.monotonic() + timeout + 30
-            check_count = 0
-            while proc.poll() is None:
-                now = _time.monotonic()
-
-                # Hard timeout
-                if now >= deadline:
-                    proc.kill()
-                    proc.wait()
-                    raise subprocess.TimeoutExpired(cmd, timeout)
-
-                # Check stuck patterns from reader threads
-                with lock:
-                    reason = stuck_reason
-                if reason:
-                    logger.warning(f"Killing Cline: {reason}")
-                    proc.kill()
-                    proc.wait()
-                    raise ClineError(
-                        f"Cline appears stuck: {reason}",
-                        stdout="\n".join(stdout_lines),
-                        stderr="\n".join(stderr_lines),
-                        exit_code=-1,
-                    )
-
-                # Heartbeat every 30s: log at INFO so the run is visibly alive in CI.
-                check_count += 1
-                if check_count % 30 == 0:
-                    current_usage = _get_openrouter_usage()
-                    elapsed = int(now - (deadline - timeout - 30))
-                    if current_usage is not None and last_usage is not None:
-                        delta = current_usage - last_usage
-                        run_total = (
-                            current_usage - run_baseline
-                            if run_baseline is not None
-                            else None
+            started = _time.monotonic()
+            deadline = started + timeout + 30
+            next_heartbeat = started + _HEARTBEAT_SECONDS
+            try:
+                while proc.poll() is None:
+                    now = _time.monotonic()
+
+                    # Hard timeout
+                    if now >= deadline:
+                        proc.kill()
+                        proc.wait()
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+
+                    # Check stuck patterns from reader threads
+                    with lock:
+                        reason = stuck_reason
+                    if reason:
+                        logger.warning(f"Killing Cline: {reason}")
+                        proc.kill()
+                        proc.wait()
+                        raise ClineError(
+                            f"Cline appears stuck: {reason}",
+                            stdout=stdout_buf.getvalue(),
+                            stderr=stderr_buf.getvalue(),
+                            exit_code=-1,
                         )
-                        run_str = (
-                            f" / ${run_total:.4f} this run"
-                            if run_total is not None
-                            else ""
+
+                    # Heartbeat: log at INFO so the run is visibly alive in CI.
+                    if now >= next_heartbeat:
+                        next_heartbeat += _HEARTBEAT_SECONDS
+                        _await_baseline()
+                        current_usage = _get_openrouter_usage()
+                        elapsed = int(now - started)
+                        if current_usage is not None and last_usage is not None:
+                            delta = current_usage - last_usage
+                            run_total = (
+                                current_usage - run_baseline
+                                if run_baseline is not None
+                                else None
+                            )
+                            run_str = (
+                                f" / ${run_total:.4f} this run"
+                                if run_total is not None
+                                else ""
+                            )
+                            usage_str = f" | +${delta:.4f} this interval{run_str}"
+                        elif current_usage is not None:
+                            usage_str = f" | usage=${current_usage:.4f}"
+                        else:
+                            usage_str = ""
+                        logger.info(
+                            f"Cline running: {elapsed}s elapsed"
+                            f" | {line_counts['stdout']} output lines"
+                            f"{usage_str}"
                         )
-                        usage_str = f" | +${delta:.4f} this interval{run_str}"
-                    elif current_usage is not None:
-                        usage_str = f" | usage=${current_usage:.4f}"
-                    else:
-                        usage_str = ""
-                    logger.info(
-                        f"Cline running: {elapsed}s elapsed"
-                        f" | {len(stdout_lines)} output lines"
-                        f"{usage_str}"
-                    )
-                    if current_usage is not None:
-                        last_usage = current_usage
+                        if current_usage is not None:
+                            last_usage = current_usage
 
-                _time.sleep(1)
+                    wait = max(0.0, min(next_heartbeat, deadline) - _time.monotonic())
+                    if poller is not None:
+                        poller.poll(wait * 1000)
+                    else:
+                        _time.sleep(min(1.0, wait))
+            finally:
+                if pidfd is not None:
+                    os.close(pidfd)
 
             # Process exited — let reader threads finish draining
             t_out.join(timeout=5)
             t_err.join(timeout=5)
 
-            result_stdout = "\n".join(stdout_lines)
-            result_stderr = "\n".join(stderr_lines)
+            result_stdout = stdout_buf.getvalue()
+            result_stderr = stderr_buf.getvalue()
             returncode = proc.returncode
 
             # Compute per-run cost from OpenRouter usage delta
-            final_usage = get_openrouter_usage()
+            _await_baseline()
+            final_usage = get_openrouter_usage(fresh=True)
             run_cost: Optional[float] = None
             if final_usage is not None and run_baseline is not None:
                 run_cost = max(0.0, final_usage - run_baseline)
@@ -405,8 +659,8 @@ class ClineRunner:
             logger.error(f"Cline timed out after {timeout}s")
             raise ClineError(
                 f"Cline timed out after {timeout} seconds",
-                stdout="\n".join(stdout_lines),
-                stderr="\n".join(stderr_lines),
+                stdout=stdout_buf.getvalue(),
+                stderr=stderr_buf.getvalue(),
                 exit_code=-1,
             )
         except FileNotFoundError:
@@ -414,6 +668,11 @@ class ClineRunner:
                 "Cline CLI binary not found. Is it installed globally?",
                 exit_code=-1,
             )
+        finally:
+            with lock:
+                wake_open = False
+            os.close(wake_r)
+            os.close(wake_w)
 
         logger.info(f"Cline finished (exit_code={returncode})")
 
@@ -422,6 +681,7 @@ class ClineRunner:
             stderr=result_stderr,
             exit_code=returncode,
             cost_usd=run_cost,
+            marker_line=marker_line,
         )
 
         if not cline_result.success:
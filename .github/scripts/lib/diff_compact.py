@@ -0,0 +1,163 @@
+"""Compact a unified diff to fit a reviewer's prompt budget.
+
+A diff that already fits is sent whole. Past the budget, a plain prefix cut
+keeps whatever happens to sort first — often a lockfile bump — and drops
+the real changes. Instead, each file's diff is handled
+separately: lockfiles, minified assets and generated code are collapsed to
+a ``+N -M`` summary, oversized files are capped, and only then is the whole
+thing held to the character budget.
+"""
+
+import fnmatch
+import re
+
+# Paths whose diff content carries no review signal
+_GENERATED_PATTERNS = (
+    "package-lock.json",
+    "*/package-lock.json",
+    "*.lock",
+    "pnpm-lock.yaml",
+    "*/pnpm-lock.yaml",
+    "*.min.js",
+    "*.min.css",
+    "dist/*",
+    "*/dist/*",
+    "*.generated.*",
+)
+
+MAX_FILE_LINES = 500
+
+TRUNCATION_MARKER = "\n\n... (diff truncated, see full diff in PR)"
+
+_HEADER_PREFIX = "diff --git "
+_FILE_SPLIT_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+# Extended header lines naming a rename's post-image path, or a removed path
+_RENAME_TO_RE = re.compile(r"^rename to (.*)$", re.MULTILINE)
+_REMOVES_PATH_RE = re.compile(r"^(?:deleted file mode|rename from) ", re.MULTILINE)
+# Escapes in a git C-quoted path; octal ones are raw (UTF-8) bytes
+_C_ESCAPE_RE = re.compile(rb'\\([0-7]{3}|[abtnvfr"\\])')
+_C_ESCAPES = {
+    b"a": b"\a",
+    b"b": b"\b",
+    b"t": b"\t",
+    b"n": b"\n",
+    b"v": b"\v",
+    b"f": b"\f",
+    b"r": b"\r",
+    b'"': b'"',
+    b"\\": b"\\",
+}
+
+
+def split_file_diffs(raw: str) -> list[str]:
+    """Split a unified diff into one chunk per file (each keeps its header)."""
+    return [chunk for chunk in _FILE_SPLIT_RE.split(raw) if chunk]
+
+
+def _unquote(name: str) -> str:
+    """Undo git's C-style quoting of a path name, if it is quoted."""
+    if not (len(name) >= 2 and name[0] == name[-1] == '"'):
+        return name
+    raw = _C_ESCAPE_RE.sub(
+        lambda m: _C_ESCAPES.get(m.group(1)) or bytes([int(m.group(1), 8)]),
+        name[1:-1].encode("utf-8"),
+    )
+    return raw.decode("utf-8", errors="replace")
+
+
+def file_diff_path(chunk: str) -> str:
+    """Return the post-image path of a single-file diff chunk, or '' if none.
+
+    Paths git had to quote (non-ASCII, quotes, backslashes) are unquoted.
+    '' also means the header could not be parsed unambiguously.
+    """
+    if not chunk.startswith(_HEADER_PREFIX):
+        return ""
+    header, _, rest = chunk.partition("\n")
+    extended = rest.partition("\n@@")[0]
+    rename = _RENAME_TO_RE.search(extended)
+    if rename:
+        return _unquote(rename.group(1))
+
+    # Otherwise both sides name the same path: "a/P b/P" or '"a/P" "b/P"',
+    # which may itself contain " b/" — so split in the middle, not on it
+    names = header[len(_HEADER_PREFIX) :]
+    half = len(names) // 2
+    src, sep, dst = names[:half], names[half : half + 1], names[half + 1 :]
+    q = 1 if dst.startswith('"') else 0
+    if (
+        sep != " "
+        or src[:q] != dst[:q]
+        or src[q : q + 2] != "a/"
+        or dst[q : q + 2] != "b/"
+        or src[q + 2 :] != dst[q + 2 :]
+    ):
+        return ""
+    return _unquote(dst[:q] + dst[q + 2 :])
+
+
+def removes_path(chunk: str) -> bool:
+    """True if a file's diff deletes it or renames it away.
+
+    Such a file is a rename-detection source: its diff can change when some
+    other file is added, so it can't be re-diffed on its own.
+    """
+    return bool(_REMOVES_PATH_RE.search(chunk.partition("\n@@")[0]))
+
+
+def is_generated_path(path: str) -> bool:
+    """True for lockfiles, minified assets and generated/build output."""
+    return any(fnmatch.fnmatchcase(path, pattern) for pattern in _GENERATED_PATTERNS)
+
+
+def _summarise(chunk: str) -> str:
+    """Replace a file's hunks with a line-count summary, keeping its header."""
+    header, _, body = chunk.partition("\n@@")
+    added = removed = 0
+    for line in body.splitlines():
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return f"{header.rstrip()}\n# compacted: +{added} -{removed} lines\n"
+
+
+def _cap_lines(chunk: str, max_lines: int) -> str:
+    """Keep the first ``max_lines`` lines of a file's diff."""
+    lines = chunk.splitlines(keepends=True)
+    if len(lines) <= max_lines:
+        return chunk
+    kept = "".join(lines[:max_lines])
+    if not kept.endswith("\n"):
+        kept += "\n"
+    return kept + f"# ... {len(lines) - max_lines} more lines in this file\n"
+
+
+def compact_diff(raw: str, budget: int, max_file_lines: int = MAX_FILE_LINES) -> str:
+    """Compact a unified diff so the reviewer sees as many real changes as possible.
+
+    Args:
+        raw: Full ``git diff`` output.
+        budget: Maximum length of the result in characters (before the
+            truncation marker).
+        max_file_lines: Per-file line cap applied after summarising
+            generated files, when the diff is over budget.
+
+    Returns:
+        The compacted diff, or ``raw`` unchanged if it already fits the
+        budget; nothing is summarised or capped then.
+    """
+    if len(raw) <= budget:
+        return raw
+
+    parts = []
+    for chunk in split_file_diffs(raw):
+        if is_generated_path(file_diff_path(chunk)):
+            parts.append(_summarise(chunk))
+        else:
+            parts.append(_cap_lines(chunk, max_file_lines))
+
+    compacted = "".join(parts)
+    if len(compacted) > budget:
+        compacted = compacted[:budget] + TRUNCATION_MARKER
+    return compacted
@@ -6,6 +6,8 @@ Uses subprocess to call git and gh CLI directly.
 
 import logging
 import subprocess
+import tempfile
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,43 @@ def _run_git(args: list[str], check: bool = True) -> subprocess.CompletedProcess
     return result
 
 
+def _run_git_capped(args: list[str], max_bytes: int) -> str:
+    """Run a git command, reading at most ``max_bytes`` of its stdout.
+
+    Git is killed once the budget is reached, so a huge output is never
+    buffered in full.
+
+    Raises:
+        GitError: If the command fails before the budget is reached.
+    """
+    cmd = ["git"] + args
+    logger.debug(f"Running (capped at {max_bytes} bytes): {' '.join(cmd)}")
+
+    # stderr goes to a file so a chatty git can't block on a full pipe
+    with tempfile.TemporaryFile() as err, subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=err
+    ) as proc:
+        data = proc.stdout.read(max_bytes)
+        if proc.stdout.read(1):
+            proc.kill()
+            proc.wait()
+            logger.warning(f"git {' '.join(args)} output capped at {max_bytes} bytes")
+            return data.decode("utf-8", errors="replace")
+        returncode = proc.wait()
+        err.seek(0)
+        stderr = err.read().decode("utf-8", errors="replace")
+
+    if returncode != 0:
+        logger.error(f"Git command failed: {' '.join(cmd)}")
+        logger.error(f"stderr: {stderr}")
+        raise GitError(
+            f"git {' '.join(args)} failed (exit {returncode}): {stderr.strip()}",
+            stderr=stderr,
+            exit_code=returncode,
+        )
+    return data.decode("utf-8", errors="replace")
+
+
 def _run_gh(args: list[str]) -> subprocess.CompletedProcess:
     """Run a gh CLI command and return the result.
 
@@ -179,6 +218,22 @@ def commit_and_push(message: str, branch: str) -> None:
         raise ValueError("Commit message cannot be empty.")
     if not branch or not branch.strip():
         raise ValueError("Branch name cannot be empty.")
+    commit_all(message)
+    push_branch(branch)
+
+
+def commit_all(message: str) -> None:
+    """Stage all changes and commit them locally.
+
+    Args:
+        message: Commit message.
+
+    Raises:
+        GitError: If there are no changes to commit, or secrets were staged.
+        ValueError: If message is empty.
+    """
+    if not message or not message.strip():
+        raise ValueError("Commit message cannot be empty.")
 
     # Stage all changes
     _run_git(["add", "-A"])
@@ -212,6 +267,20 @@ def commit_and_push(message: str, branch: str) -> None:
     _run_git(["commit", "-m", message])
     logger.info(f"Committed: {message[:80]}")
 
+
+def push_branch(branch: str) -> None:
+    """Push a branch to origin, retrying once via pull-rebase if rejected.
+
+    Args:
+        branch: Branch name to push.
+
+    Raises:
+        GitError: If push fails.
+        ValueError: If branch is empty.
+    """
+    if not branch or not branch.strip():
+        raise ValueError("Branch name cannot be empty.")
+
     # Push — retry once with pull-rebase on non-fast-forward rejection
     push_result = _run_git(["push", "origin", branch.strip()], check=False)
     if push_result.returncode != 0:
@@ -289,19 +358,47 @@ def get_pr_number(pr_url: str) -> str:
     return parts[-1]
 
 
-def get_diff(base: str = "main") -> str:
+def get_diff(
+    base: str = "main",
+    paths: Optional[list[str]] = None,
+    max_bytes: Optional[int] = None,
+) -> str:
     """Get the diff between base branch and HEAD.
 
     Args:
         base: Base branch to diff against.
+        paths: If given, limit the diff to these paths.
+        max_bytes: If given, stop reading (and kill git) after this many
+            bytes instead of buffering the whole diff.
 
     Returns:
         Diff string.
     """
-    result = _run_git(["diff", f"{base}...HEAD"])
+    args = ["diff", f"{base}...HEAD"]
+    if paths:
+        # Literal, so a path containing glob characters matches only itself
+        args += ["--", *(f":(literal){path}" for path in paths)]
+    if max_bytes is not None:
+        return _run_git_capped(args, max_bytes)
+    result = _run_git(args)
     return result.stdout
 
 
+def get_head_sha() -> str:
+    """Return the commit SHA of HEAD."""
+    return _run_git(["rev-parse", "HEAD"]).stdout.strip()
+
+
+def get_files_changed_since(rev: str) -> list[str]:
+    """List files that differ between ``rev`` and HEAD.
+
+    Renames are reported as a delete plus an add so both paths are listed.
+    Names are NUL-separated so git never quotes them.
+    """
+    result = _run_git(["diff", "--name-only", "--no-renames", "-z", rev, "HEAD"])
+    return [f for f in result.stdout.split("\0") if f]
+
+
 def get_changed_files(base: str = "main") -> list[str]:
     """Get list of files changed between base and HEAD.
 
@@ -345,6 +442,23 @@ def post_pr_comment(pr_number: str, body: str) -> None:
     logger.info(f"Posted comment on PR #{pr_number}")
 
 
+def dispatch_workflow(workflow: str, inputs: dict[str, str]) -> None:
+    """Trigger a workflow_dispatch run on the default branch.
+
+    Args:
+        workflow: Workflow file name (e.g. 'ralph-self-review.yml').
+        inputs: workflow_dispatch inputs.
+
+    Raises:
+        GitError: If the dispatch fails.
+    """
+    args = ["workflow", "run", workflow]
+    for key, value in inputs.items():
+        args += ["-f", f"{key}={value}"]
+    _run_gh(args)
+    logger.info(f"Dispatched workflow {workflow}")
+
+
 def _ensure_label_exists(label: str) -> None:
     """Create the label in the repo if it doesn't already exist."""
     label_colors = {
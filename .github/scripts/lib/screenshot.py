@@ -3,7 +3,12 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from lib.utils import load_prompt_template, screenshot_relative_path
+from lib.utils import (
+    embed_screenshots_markdown,
+    load_prompt_template,
+    read_visual_verdict,
+    screenshot_relative_path,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -124,7 +129,8 @@ def _parse_selected_paths(verdict_path: Path, screenshots_dir: Path) -> list[Pat
         logger.warning("Visual verdict file not written by model")
         return []
     verdict_text = verdict_path.read_text(encoding="utf-8").strip()
-    logger.info(f"Visual verdict: {verdict_text.splitlines()[0]}")
+    first_line = verdict_text.partition("\n")[0]
+    logger.info(f"Visual verdict: {first_line}")
     match = re.search(r"SELECTED:\s*([^\n]+)", verdict_text, re.IGNORECASE)
     if not match:
         logger.warning("No SELECTED line found in verdict file")
@@ -1,6 +1,13 @@
+import functools
+import http.client
 import logging
+import os
+import re
+import signal
 import subprocess
+import threading
 import time
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
@@ -17,51 +24,111 @@ _FRONTEND_GLOBS = [
     "*.svelte",
 ]
 
+# A {{KEY}} placeholder, or any other brace (escaped for str.format)
+_TEMPLATE_TOKEN_RE = re.compile(r"\{\{([A-Za-z_]\w*)\}\}|[{}]")
 
-def start_server(repo_root: Path) -> subprocess.Popen:
-    logger.info("Starting backend server...")
+_SERVER_HOST = "localhost"
+_SERVER_PORT = 3000
+# Readiness polling: start fast (the server is usually up in ~100ms), back
+# off to at most once a second, give up after the startup deadline
+_SERVER_STARTUP_SECONDS = 30
+_POLL_INITIAL_DELAY = 0.025
+_POLL_MAX_DELAY = 1.0
+# An install that prints nothing for this long is treated as hung
+_INSTALL_IDLE_TIMEOUT = 60
 
-    subprocess.run(
-        ["npm", "ci"],
-        cwd=str(repo_root / "backend"),
-        capture_output=True,
+
+def _server_ready(conn: http.client.HTTPConnection) -> bool:
+    """True if GET / answers 200. The connection reopens itself on the next request."""
+    try:
+        conn.request("GET", "/")
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        return False
+
+
+def _run_install(cmd: list[str], cwd: str) -> None:
+    """Run an install command, killing it once it goes quiet for too long.
+
+    Raises subprocess.TimeoutExpired if no output arrives for
+    _INSTALL_IDLE_TIMEOUT seconds, CalledProcessError on a non-zero exit.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
         text=True,
-        check=True,
+        errors="replace",
+        # Own process group, so a hung install's children go down with it
+        start_new_session=True,
     )
+    tail: deque[str] = deque(maxlen=50)
+    last_output = time.monotonic()
+
+    def drain() -> None:
+        nonlocal last_output
+        for line in proc.stdout:
+            tail.append(line)
+            last_output = time.monotonic()
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    while True:
+        try:
+            proc.wait(timeout=1)
+            break
+        except subprocess.TimeoutExpired:
+            if time.monotonic() - last_output > _INSTALL_IDLE_TIMEOUT:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                proc.wait()
+                reader.join()
+                raise subprocess.TimeoutExpired(
+                    cmd, _INSTALL_IDLE_TIMEOUT, output="".join(tail)
+                )
+    reader.join()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output="".join(tail)
+        )
+
+
+def start_server(repo_root: Path) -> subprocess.Popen:
+    logger.info("Starting backend server...")
+    backend_dir = str(repo_root / "backend")
+
+    # --loglevel=http logs each package fetch, so a stalled install goes quiet
+    _run_install(["npm", "ci", "--loglevel=http"], backend_dir)
 
     proc = subprocess.Popen(
         ["node", "server.js"],
-        cwd=str(repo_root / "backend"),
+        cwd=backend_dir,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
 
-    for _ in range(30):
-        try:
-            result = subprocess.run(
-                [
-                    "curl",
-                    "-s",
-                    "-o",
-                    "/dev/null",
-                    "-w",
-                    "%{http_code}",
-                    "http://localhost:3000/",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            if result.stdout.strip() == "200":
+    conn = http.client.HTTPConnection(_SERVER_HOST, _SERVER_PORT, timeout=5)
+    deadline = time.monotonic() + _SERVER_STARTUP_SECONDS
+    delay = _POLL_INITIAL_DELAY
+    try:
+        while time.monotonic() < deadline:
+            if _server_ready(conn):
                 logger.info("Backend server is ready")
                 return proc
-        except (subprocess.TimeoutExpired, Exception):
-            pass
-        time.sleep(1)
+            time.sleep(delay)
+            delay = min(delay * 1.6, _POLL_MAX_DELAY)
+    finally:
+        conn.close()
 
     proc.kill()
     raise RuntimeError(
-        "Backend server failed to start within 30 seconds. "
+        f"Backend server failed to start within {_SERVER_STARTUP_SECONDS} seconds. "
         "Check backend/server.js for errors."
     )
 
@@ -80,10 +147,12 @@ def run_tests(repo_root: Path, test_timeout: int) -> tuple[bool, str]:
     logger.info("Running tests...")
 
     try:
+        # Merge stderr into stdout at the fd level: one buffer, one decode
         result = subprocess.run(
             ["npm", "test"],
             cwd=str(repo_root),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
             timeout=test_timeout,
         )
@@ -91,7 +160,7 @@ def run_tests(repo_root: Path, test_timeout: int) -> tuple[bool, str]:
         logger.warning(f"Tests timed out after {test_timeout}s")
         return False, f"Tests timed out after {test_timeout}s"
 
-    output = result.stdout + "\n" + result.stderr
+    output = result.stdout
     success = result.returncode == 0
 
     if success:
@@ -103,30 +172,54 @@ def run_tests(repo_root: Path, test_timeout: int) -> tuple[bool, str]:
     return success, output
 
 
-def get_git_diff(repo_root: Path) -> str:
-    result = subprocess.run(
-        ["git", "diff", "HEAD"],
-        cwd=str(repo_root),
-        capture_output=True,
-        text=True,
-        timeout=30,
+def _read_capped(cmd: list[str], cwd: Path, max_bytes: int, timeout: int) -> str:
+    """Read up to max_bytes of cmd's stdout, killing it after timeout seconds.
+
+    Raises subprocess.TimeoutExpired if the deadline kills the command.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    diff = result.stdout.strip()
+    timed_out = threading.Event()
+
+    def expire() -> None:
+        timed_out.set()
+        proc.kill()
+
+    # The read itself can stall, so the deadline has to be able to end it
+    timer = threading.Timer(timeout, expire)
+    timer.start()
+    try:
+        data = proc.stdout.read(max_bytes)
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output=data)
+    return data.decode("utf-8", errors="ignore")
+
+
+def get_git_diff(repo_root: Path, max_bytes: int = 5000) -> str:
+    diff = _read_capped(
+        ["git", "diff", "HEAD", "--no-color"], repo_root, max_bytes, timeout=30
+    ).strip()
     if not diff:
-        result = subprocess.run(
-            ["git", "status", "--short"],
-            cwd=str(repo_root),
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        diff = result.stdout.strip()
-    return diff[:5000]
+        diff = _read_capped(
+            ["git", "status", "--short"], repo_root, max_bytes, timeout=10
+        ).strip()
+    return diff
 
 
 def get_frontend_diff(repo_root: Path) -> str:
+    # --no-color/--no-ext-diff: plain patch text whatever the user's git config
     result = subprocess.run(
-        ["git", "diff", "main..HEAD", "--", *_FRONTEND_GLOBS],
+        ["git", "diff", "--no-color", "--no-ext-diff", "main..HEAD", "--", *_FRONTEND_GLOBS],
         cwd=str(repo_root),
         capture_output=True,
         text=True,
@@ -135,7 +228,7 @@ def get_frontend_diff(repo_root: Path) -> str:
     diff = result.stdout.strip()
     if not diff:
         result = subprocess.run(
-            ["git", "diff", "HEAD", "--", *_FRONTEND_GLOBS],
+            ["git", "diff", "--no-color", "--no-ext-diff", "HEAD", "--", *_FRONTEND_GLOBS],
             cwd=str(repo_root),
             capture_output=True,
             text=True,
@@ -146,6 +239,10 @@ def get_frontend_diff(repo_root: Path) -> str:
 
 
 def get_repo_name() -> str:
+    # Set on every GitHub Actions runner; saves spawning gh for an API call
+    repo = os.environ.get("GITHUB_REPOSITORY", "").strip()
+    if repo:
+        return repo
     try:
         result = subprocess.run(
             ["gh", "repo", "view", "--json", "nameWithOwner", "-q", ".nameWithOwner"],
@@ -167,16 +264,34 @@ def get_repo_name() -> str:
         return f"{parts[-2]}/{parts[-1]}"
 
 
+class _KeepMissing(dict):
+    """format_map mapping that leaves unknown placeholders as {{KEY}}."""
+
+    def __missing__(self, key: str) -> str:
+        return "{{" + key + "}}"
+
+
+def _to_format_string(text: str) -> str:
+    """Rewrite {{KEY}} as {KEY} and double every other brace."""
+    return _TEMPLATE_TOKEN_RE.sub(
+        lambda m: "{" + m.group(1) + "}" if m.group(1) else m.group(0) * 2, text
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _read_template(path: Path, mtime_ns: int) -> str:
+    # mtime_ns is part of the cache key so an edited template is re-read
+    return _to_format_string(path.read_bytes().decode("utf-8"))
+
+
 def load_prompt_template(prompts_dir: Path, name: str, **kwargs: str) -> str:
     path = prompts_dir / name
-    if not path.exists():
-        raise FileNotFoundError(f"Prompt template not found: {path}")
-
-    content = path.read_text(encoding="utf-8")
-    for key, value in kwargs.items():
-        content = content.replace(f"{{{{{key}}}}}", str(value))
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt template not found: {path}") from None
 
-    return content
+    return _read_template(path, mtime_ns).format_map(_KeepMissing(kwargs))
 
 
 def screenshot_relative_path(path: Path) -> str:
@@ -5,15 +5,27 @@ Runs a fresh Cline instance to review the code changes, then optionally
 loops back to fix issues. Maximum 3 review iterations. The reviewer is
 lenient — only rejecting clearly broken or missing things.
 
+With REVIEW_DISPATCH_WORKFLOW set, each follow-up iteration after a pushed
+fix is handed to a new workflow run (starting at REVIEW_ITERATION) rather
+than looping in this process.
+
 All failures are explicit. Verbose reasoning goes to stdout (workflow logs),
 only summaries are posted as PR comments.
 """
 
+import functools
+import hashlib
 import logging
 import os
+import re
+import signal
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path so lib/ is importable
 sys.path.insert(0, str(Path(__file__).parent))
@@ -25,10 +37,20 @@ from lib.cline_runner import (
     READ_ONLY_PERMISSIONS,
     get_openrouter_usage,
 )
+from lib.diff_compact import (
+    compact_diff,
+    file_diff_path,
+    is_generated_path,
+    removes_path,
+    split_file_diffs,
+)
 from lib.git_ops import (
-    commit_and_push,
+    commit_all,
+    dispatch_workflow,
+    push_branch,
     get_diff,
-    get_changed_files,
+    get_files_changed_since,
+    get_head_sha,
     post_pr_comment,
     label_pr,
     GitError,
@@ -36,12 +58,13 @@ from lib.git_ops import (
 from lib.issue_parser import parse_issue, require_env
 from lib.logging_config import setup_logging, format_review_summary
 from lib.screenshot import read_visual_verdict
+from lib.utils import load_prompt_template
 
 logger = logging.getLogger("self-review")
 
 # Constants
-REPO_ROOT = Path(__file__).resolve().parent.parent.parent
 SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent.parent
 MCP_SETTINGS_PATH = SCRIPTS_DIR / "cline-config" / "cline_mcp_settings.json"
 PROMPTS_DIR = SCRIPTS_DIR / "prompts"
 SCREENSHOTS_DIR = REPO_ROOT / "screenshots"
@@ -51,18 +74,31 @@ _cfg = load_config()
 MAX_REVIEW_ITERATIONS = _cfg.retries.max_review_iterations
 REVIEW_TIMEOUT = _cfg.timeouts.review_seconds
 FIX_TIMEOUT = _cfg.timeouts.fix_seconds
+MAX_DIFF_CHARS = 30000
+# Test output kept for the heal prompt, and how much of it to collect after
+# the first failing test file before the run is cut short
+TEST_OUTPUT_MAX_LINES = 2000
+TEST_FAIL_CONTEXT_LINES = 200
+# How much test output / review feedback is quoted into fixer prompts
+PROMPT_OUTPUT_MAX_CHARS = 5000
+# Memory ceiling on the raw diff read from git. Kept well above MAX_DIFF_CHARS
+# so compact_diff() can still see past a large lockfile or generated file.
+MAX_DIFF_BYTES = 8 * 1024 * 1024
+# Heading the visual verdict is appended under in the PR summary comment
+_VISUAL_QA_HEADING = "\n\n### Visual QA\n"
+
+# Markdown bold/italic/code/quote/heading/rule markers, blanked before matching
+_MARKDOWN_NOISE = str.maketrans("*_`>#-", "      ")
+# A verdict needs the word itself; without it there's nothing to parse
+_VERDICT_WORD_RE = re.compile("verdict", re.IGNORECASE)
+
+# Matches lines like "Verdict: LGTM" or "**Verdict:** NEEDS CHANGES"
+_VERDICT_MARKER = r"verdict\W*:\W*(lgtm|needs[ _]changes)"
 
 
 def load_template(name: str, **kwargs: str) -> str:
-    """Load a prompt template and substitute placeholders."""
-    path = PROMPTS_DIR / name
-    if not path.exists():
-        raise FileNotFoundError(f"Prompt template not found: {path}")
-
-    content = path.read_text(encoding="utf-8")
-    for key, value in kwargs.items():
-        content = content.replace(f"{{{{{key}}}}}", str(value))
-    return content
+    """Load a prompt template from PROMPTS_DIR and substitute placeholders."""
+    return load_prompt_template(PROMPTS_DIR, name, **kwargs)
 
 
 def parse_verdict(review_output: str) -> str:
@@ -77,30 +113,28 @@ def parse_verdict(review_output: str) -> str:
         'LGTM' or 'NEEDS CHANGES'. Defaults to 'LGTM' if no clear verdict
         is found (lenient — benefit of the doubt).
     """
-    import re
-
-    # Strip markdown noise from each line before matching
-    clean_output = re.sub(r"[*_`>#\-]", " ", review_output)
-
-    for line in clean_output.splitlines():
-        line_stripped = line.strip().lower()
-        if "verdict" in line_stripped and ":" in line_stripped:
-            after_colon = line_stripped.split(":", 1)[1].strip()
-            if (
-                "needs changes" in after_colon
-                or "needs_changes" in after_colon
-                or "needs changes" in line_stripped
-            ):
-                return "NEEDS CHANGES"
-            if "lgtm" in after_colon:
-                return "LGTM"
-
-    # Also do a looser full-text scan in case the verdict isn't on its own line
-    clean_lower = clean_output.lower()
-    if "needs changes" in clean_lower or "needs_changes" in clean_lower:
-        # Only count it if "verdict" appears nearby (within 100 chars)
+    # Most reviews that never say "verdict" are rejected by this one scan
+    if _VERDICT_WORD_RE.search(review_output):
+        # Strip markdown noise and lowercase once, not per line
+        clean_lower = review_output.translate(_MARKDOWN_NOISE).lower()
+
+        # A "verdict:" line that mentions "needs changes" anywhere wins over
+        # an LGTM on the same line ("Verdict: LGTM or Verdict: NEEDS CHANGES")
+        for line in clean_lower.splitlines():
+            if "verdict" in line:
+                colon = line.find(":")
+                if colon != -1:
+                    if "needs changes" in line:
+                        return "NEEDS CHANGES"
+                    if "lgtm" in line[colon + 1 :]:
+                        return "LGTM"
+
+        # Also do a looser full-text scan in case the verdict isn't on its
+        # own line; only count it if "verdict" appears nearby (within 100 chars)
         idx = clean_lower.find("needs changes")
-        if idx != -1 and "verdict" in clean_lower[max(0, idx - 100) : idx + 50]:
+        if idx != -1 and _VERDICT_WORD_RE.search(
+            clean_lower, max(0, idx - 100), idx + 50
+        ):
             return "NEEDS CHANGES"
 
     # No clear verdict found — be lenient
@@ -108,23 +142,66 @@ def parse_verdict(review_output: str) -> str:
     return "LGTM"
 
 
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
 def run_tests() -> tuple[bool, str]:
-    """Run the project test suite."""
+    """Run the project test suite.
+
+    Output is streamed rather than buffered. Once Jest reports a failing
+    test file and enough of its details have been captured, the run is
+    stopped: the fixer needs one clear failure, not the rest of the suite.
+    """
     logger.info("Running tests...")
+    timeout = _cfg.timeouts.test_seconds
+    # Own process group so the kill reaches jest/playwright/web server too
+    proc = subprocess.Popen(
+        ["npm", "test"],
+        cwd=str(REPO_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        start_new_session=True,
+    )
+    timed_out = threading.Event()
+
+    def _on_timeout() -> None:
+        timed_out.set()
+        _kill_process_group(proc)
+
+    watchdog = threading.Timer(timeout, _on_timeout)
+    watchdog.start()
+    lines: deque[str] = deque(maxlen=TEST_OUTPUT_MAX_LINES)
+    lines_since_fail: Optional[int] = None
+    stopped_early = False
     try:
-        result = subprocess.run(
-            ["npm", "test"],
-            cwd=str(REPO_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=_cfg.timeouts.test_seconds,
-        )
-        output = result.stdout + "\n" + result.stderr
-        return result.returncode == 0, output
-    except subprocess.TimeoutExpired:
-        msg = f"Tests timed out after {_cfg.timeouts.test_seconds}s"
+        for line in proc.stdout:
+            lines.append(line)
+            if lines_since_fail is None:
+                if line.startswith("FAIL "):
+                    lines_since_fail = 0
+                continue
+            lines_since_fail += 1
+            if lines_since_fail >= TEST_FAIL_CONTEXT_LINES:
+                logger.info("Test failure captured; stopping the test run early")
+                stopped_early = True
+                _kill_process_group(proc)
+                break
+        proc.wait()
+    finally:
+        watchdog.cancel()
+        proc.stdout.close()
+
+    if timed_out.is_set():
+        msg = f"Tests timed out after {timeout}s"
         logger.warning(msg)
         return False, msg
+    return proc.returncode == 0 and not stopped_early, "".join(lines)
 
 
 def self_heal_loop(fixer: ClineRunner, issue, max_attempts: int = 3) -> bool:
@@ -138,25 +215,33 @@ def self_heal_loop(fixer: ClineRunner, issue, max_attempts: int = 3) -> bool:
     Returns:
         True if tests pass, False otherwise.
     """
-    for attempt in range(1, max_attempts + 1):
-        success, test_output = run_tests()
-        if success:
-            logger.info(f"Tests passed on heal attempt {attempt}")
-            return True
-
-        logger.warning(f"Tests failed (heal attempt {attempt}/{max_attempts})")
-
-        if attempt < max_attempts:
-            heal_prompt = load_template(
-                "heal_prompt.md",
-                ISSUE_NUMBER=str(issue.number),
-                ISSUE_TITLE=issue.title,
-                TEST_OUTPUT=test_output[:5000],
-            )
-            try:
-                fixer.run(heal_prompt, timeout=FIX_TIMEOUT, cwd=REPO_ROOT)
-            except ClineError as e:
-                logger.error(f"Heal attempt {attempt} failed: {e}")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending_tests = pool.submit(run_tests)
+        # The issue fields are the same every attempt: fill them in while the
+        # first test run is going, leaving {{TEST_OUTPUT}} for later.
+        heal_base = load_template(
+            "heal_prompt.md",
+            ISSUE_NUMBER=str(issue.number),
+            ISSUE_TITLE=issue.title,
+        )
+
+        for attempt in range(1, max_attempts + 1):
+            success, test_output = pending_tests.result()
+            if success:
+                logger.info(f"Tests passed on heal attempt {attempt}")
+                return True
+
+            logger.warning(f"Tests failed (heal attempt {attempt}/{max_attempts})")
+
+            if attempt < max_attempts:
+                heal_prompt = heal_base.replace(
+                    "{{TEST_OUTPUT}}", test_output[:PROMPT_OUTPUT_MAX_CHARS]
+                )
+                try:
+                    fixer.run(heal_prompt, timeout=FIX_TIMEOUT, cwd=REPO_ROOT)
+                except ClineError as e:
+                    logger.error(f"Heal attempt {attempt} failed: {e}")
+                pending_tests = pool.submit(run_tests)
 
     return False
 
@@ -181,7 +266,7 @@ def _safe_post_pr_comment(pr_number: str, body: str) -> None:
 
 def _build_cost_section(baseline: "float | None") -> str:
     """Return a markdown cost section string, or empty string if unavailable."""
-    final = get_openrouter_usage()
+    final = get_openrouter_usage(fresh=True)
     if final is not None and baseline is not None:
         cost = max(0.0, final - baseline)
         logger.info(f"Self-review total cost: ${cost:.4f} USD")
@@ -189,6 +274,289 @@ def _build_cost_section(baseline: "float | None") -> str:
     return ""
 
 
+class DiffCache:
+    """Per-file view of the branch diff, refreshed incrementally between reviews.
+
+    The first refresh fetches the whole ``base...HEAD`` diff. Later refreshes
+    re-fetch only the files touched since the last seen HEAD, so each fix
+    round costs in proportion to what the fixer changed, not the PR size.
+    Whenever a path-limited diff could differ from the full one, the whole
+    diff is fetched again instead.
+    """
+
+    def __init__(self, base: str = "main"):
+        self.base = base
+        self._head: Optional[str] = None
+        self._files: dict[str, str] = {}
+        # The diff as fetched, when it couldn't be split by path
+        self._whole: Optional[str] = None
+        # Content hash of ``diff`` — a change-detection key, not a security one
+        self.digest = b""
+
+    @staticmethod
+    def _index(diff: str) -> Optional[dict[str, str]]:
+        """Map each file's path to its diff, or None if a path can't be parsed."""
+        files = {}
+        for chunk in split_file_diffs(diff):
+            path = file_diff_path(chunk)
+            if not path:
+                return None
+            files[path] = chunk
+        return files
+
+    def _refresh_all(self) -> None:
+        diff = get_diff(self.base, max_bytes=MAX_DIFF_BYTES)
+        files = self._index(diff)
+        if files is None:
+            logger.warning("Could not parse every path in the diff; keeping it whole")
+            self._files, self._whole = {}, diff
+        else:
+            self._files, self._whole = files, None
+        logger.info(f"Changed files: {len(self.changed_files)}")
+
+    def _refresh_paths(self, touched: list[str]) -> bool:
+        """Re-diff only ``touched``; False if that can't match a full diff."""
+        # Rename detection pairs a removed file with an added one anywhere in
+        # the diff, which a path-limited diff can't see — so only re-diff
+        # separately while nothing in the PR is deleted or renamed away
+        if self._whole is not None or any(map(removes_path, self._files.values())):
+            return False
+        diff = get_diff(self.base, paths=touched, max_bytes=MAX_DIFF_BYTES)
+        files = self._index(diff)
+        if files is None or any(map(removes_path, files.values())):
+            return False
+        for path in touched:
+            self._files.pop(path, None)
+        self._files.update(files)
+        self._files = dict(sorted(self._files.items()))
+        return True
+
+    def refresh(self) -> None:
+        head = get_head_sha()
+        if head == self._head:
+            return
+        if self._head is None:
+            self._refresh_all()
+        else:
+            touched = get_files_changed_since(self._head)
+            if not touched or self._refresh_paths(touched):
+                logger.info(f"Diff cache refreshed {len(touched)} file(s)")
+            else:
+                self._refresh_all()
+        self._head = head
+        self.digest = hashlib.blake2b(self.diff.encode(), digest_size=16).digest()
+
+    @property
+    def diff(self) -> str:
+        if self._whole is not None:
+            return self._whole
+        return "".join(self._files.values())
+
+    @property
+    def changed_files(self) -> list[str]:
+        if self._whole is not None:
+            paths = (file_diff_path(c) for c in split_file_diffs(self._whole))
+            return [path for path in paths if path]
+        return list(self._files)
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_visual_verdict(mtime_ns: int) -> Optional[str]:
+    return read_visual_verdict(SCREENSHOTS_DIR)
+
+
+def _visual_verdict(issue) -> Optional[str]:
+    """Return the after-screenshot visual verdict for frontend issues.
+
+    The file is written once upstream, so it is read once per process; the
+    cache is keyed on its mtime so a rewritten verdict is picked up.
+    """
+    if not issue.is_frontend():
+        return None
+    try:
+        mtime_ns = (SCREENSHOTS_DIR / "visual_verdict.txt").stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _cached_visual_verdict(mtime_ns)
+
+
+def _visual_section(issue) -> str:
+    """Visual QA block for the PR summary comment; empty without a verdict."""
+    visual_verdict = _visual_verdict(issue)
+    return _VISUAL_QA_HEADING + visual_verdict if visual_verdict else ""
+
+
+def _make_reviewer() -> ClineRunner:
+    """Create the read-only reviewer; reused across iterations."""
+    return ClineRunner(
+        cline_dir=REPO_ROOT / ".cline-reviewer",
+        model=_cfg.models.reviewer,
+        command_permissions=READ_ONLY_PERMISSIONS,
+    )
+
+
+def _make_fixer() -> ClineRunner:
+    """Create the fixer; reused across iterations."""
+    return ClineRunner(
+        cline_dir=REPO_ROOT / ".cline-fixer",
+        model=_cfg.models.fixer,
+        # No MCP settings — fixer uses CLI tools only, same as coding_cline.
+    )
+
+
+def _run_review_iteration(
+    reviewer: ClineRunner, issue, diff_cache: DiffCache
+) -> tuple[Optional[str], str]:
+    """Gather the diff, run one reviewer pass and parse its verdict.
+
+    Returns:
+        (verdict, review_output). verdict is None when there is no diff to review.
+
+    Raises:
+        ClineError: If the reviewer Cline crashes.
+    """
+    # The diff refresh and the verdict file read are independent; overlap them.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        refresh_future = pool.submit(diff_cache.refresh)
+        visual_future = pool.submit(_visual_verdict, issue)
+        refresh_future.result()
+        visual_verdict = visual_future.result()
+    diff = diff_cache.diff
+    changed_files = diff_cache.changed_files
+
+    if not diff.strip():
+        return None, ""
+
+    # Compact diff if too large to avoid token limits
+    original_len = len(diff)
+    diff = compact_diff(diff, MAX_DIFF_CHARS)
+    if len(diff) != original_len:
+        logger.info(f"Diff compacted from {original_len} to {len(diff)} chars")
+
+    review_prompt = load_template(
+        "review_prompt.md",
+        ISSUE_NUMBER=str(issue.number),
+        ISSUE_TITLE=issue.title,
+        ISSUE_BODY=issue.body,
+        GIT_DIFF=diff,
+        CHANGED_FILES="\n".join(changed_files),
+    )
+
+    # Prepend any visual QA findings from the after-screenshot review
+    # (only relevant for frontend issues that actually took screenshots)
+    if visual_verdict:
+        first_line = visual_verdict.partition("\n")[0]
+        logger.info(f"Injecting visual verdict into review prompt: {first_line}")
+        review_prompt = "".join(
+            [
+                "## Visual QA (from after-screenshot review)\n",
+                visual_verdict,
+                "\n\n"
+                "If the visual QA flags a FEATURE_NOT_FOUND or ISSUE, treat that as strong "
+                "signal that the fix may be incomplete or broken visually. "
+                "Factor this into your verdict.\n\n"
+                "---\n\n",
+                review_prompt,
+            ]
+        )
+
+    result = reviewer.run(
+        review_prompt, timeout=REVIEW_TIMEOUT, cwd=REPO_ROOT, marker=_VERDICT_MARKER
+    )
+    review_output = result.stdout
+    # Always decide on the whole output: a later verdict line can't override
+    # an earlier one that says NEEDS CHANGES. The streamed line is only used
+    # to flag a review that contradicts itself.
+    verdict = parse_verdict(review_output)
+    if result.marker_line and parse_verdict(result.marker_line) != verdict:
+        logger.warning(
+            f"Verdict line {result.marker_line.strip()!r} disagrees with the "
+            f"full review; using {verdict}"
+        )
+    logger.info(f"Review verdict: {verdict}")
+    return verdict, review_output
+
+
+def _apply_review_fixes(
+    fixer: ClineRunner, iteration: int, issue, review_output: str
+) -> bool:
+    """Run the fixer and self-heal loop, then commit the result.
+
+    Returns:
+        True if the fixes were committed, False if the commit failed.
+    """
+    fix_prompt = load_template(
+        "review_fix_prompt.md",
+        ISSUE_NUMBER=str(issue.number),
+        ISSUE_TITLE=issue.title,
+        ISSUE_BODY=issue.body,
+        REVIEW_FEEDBACK=review_output[:PROMPT_OUTPUT_MAX_CHARS],
+    )
+
+    try:
+        fixer.run(fix_prompt, timeout=FIX_TIMEOUT, cwd=REPO_ROOT)
+    except ClineError as e:
+        logger.error(f"Fix attempt failed: {e}")
+
+    # Self-heal tests after fix
+    self_heal_loop(fixer, issue, max_attempts=_cfg.retries.max_heal_attempts)
+
+    # Commit fixes; pushing is left to the caller so it can overlap other work
+    try:
+        commit_all(f"fix(#{issue.number}): address review feedback (round {iteration})")
+    except GitError as e:
+        logger.error(
+            f"Commit after review fix failed (round {iteration}): {e}. "
+            f"Cannot proceed — next review would see a stale diff. Stopping."
+        )
+        return False
+    return True
+
+
+def _push_fixes(iteration: int, branch: str) -> bool:
+    """Push the committed review fixes. Returns False if the push failed."""
+    try:
+        push_branch(branch)
+    except GitError as e:
+        logger.error(
+            f"Push after review fix failed (round {iteration}): {e}. "
+            f"Cannot proceed — the PR would not show the reviewed code. Stopping."
+        )
+        return False
+    return True
+
+
+def _dispatch_next_review(
+    workflow: str, issue, pr_number: str, branch: str, iteration: int
+) -> bool:
+    """Hand the next review iteration to a fresh workflow run.
+
+    Returns:
+        True if dispatched. False if the dispatch failed, in which case the
+        caller carries on in this process.
+    """
+    try:
+        dispatch_workflow(
+            workflow,
+            {
+                "issue_number": str(issue.number),
+                "pr_number": pr_number,
+                "branch": branch,
+                "issue_labels": os.environ.get("ISSUE_LABELS", ""),
+                "iteration": str(iteration),
+                "screenshots_run_id": os.environ.get("SCREENSHOTS_RUN_ID", ""),
+            },
+        )
+    except GitError as e:
+        logger.warning(
+            f"Could not dispatch review iteration {iteration} ({e}). "
+            f"Continuing in this run."
+        )
+        return False
+    logger.info(f"Review iteration {iteration} handed off to {workflow}")
+    return True
+
+
 def main() -> None:
     setup_logging(verbose=True)
 
@@ -209,110 +577,82 @@ def main() -> None:
 
     require_env("OPENROUTER_API_KEY")
 
+    # Set when this run continues a review handed off by a previous run
+    first_iteration = int(os.environ.get("REVIEW_ITERATION", "1"))
+    if not 1 <= first_iteration <= MAX_REVIEW_ITERATIONS:
+        raise ValueError(
+            f"REVIEW_ITERATION must be between 1 and {MAX_REVIEW_ITERATIONS}, "
+            f"got {first_iteration}"
+        )
+    dispatch_to = os.environ.get("REVIEW_DISPATCH_WORKFLOW", "").strip()
+
     logger.info(f"Reviewing PR #{pr_number} for issue #{issue.number}")
 
     # ── 2. Review loop ──────────────────────────────────────────
     last_review_output = ""
+    reviewer = _make_reviewer()
+    fixer: Optional[ClineRunner] = None
+    diff_cache = DiffCache("main")
+
+    # Lockfile bumps and build output give the reviewer nothing to judge
+    diff_cache.refresh()
+    changed_files = diff_cache.changed_files
+    if changed_files and all(is_generated_path(f) for f in changed_files):
+        logger.info("Only generated/lock files changed. Skipping review.")
+        _safe_label_pr(pr_number, "review-passed")
+        _safe_post_pr_comment(
+            pr_number,
+            format_review_summary(
+                "Generated/lock-file-only changes. Auto-approving.\n\n"
+                + "\n".join(f"- `{f}`" for f in changed_files)
+                + _build_cost_section(_cost_baseline),
+                "PASSED",
+            ),
+        )
+        return
 
-    for iteration in range(1, MAX_REVIEW_ITERATIONS + 1):
+    for iteration in range(first_iteration, MAX_REVIEW_ITERATIONS + 1):
         logger.info("=" * 40)
         logger.info(f"REVIEW ITERATION {iteration}/{MAX_REVIEW_ITERATIONS}")
         logger.info("=" * 40)
 
-        # Fresh reviewer context each time
-        reviewer = ClineRunner(
-            cline_dir=REPO_ROOT / f".cline-reviewer-{iteration}",
-            model=_cfg.models.reviewer,
-            command_permissions=READ_ONLY_PERMISSIONS,
-        )
-
-        # Gather diff context
-        diff = get_diff("main")
-        changed_files = get_changed_files("main")
-
-        if not diff.strip():
-            logger.warning("No diff found. Marking as passed.")
+        try:
+            verdict, last_review_output = _run_review_iteration(
+                reviewer, issue, diff_cache
+            )
+            reviewed_digest = diff_cache.digest
+        except ClineError as e:
+            logger.error(
+                f"Reviewer Cline crashed: {e}. Treating as LGTM (benefit of the doubt)."
+            )
+            visual_section = _visual_section(issue)
             _safe_label_pr(pr_number, "review-passed")
             _safe_post_pr_comment(
                 pr_number,
                 format_review_summary(
-                    "No changes detected. Auto-approving."
+                    f"Reviewer failed to run (Cline error). Auto-approving.\n\nError: {e}{visual_section}"
                     + _build_cost_section(_cost_baseline),
                     "PASSED",
                 ),
             )
             return
 
-        # Truncate diff if too large to avoid token limits
-        max_diff_len = 30000
-        if len(diff) > max_diff_len:
-            original_len = len(diff)
-            diff = diff[:max_diff_len] + "\n\n... (diff truncated, see full diff in PR)"
-            logger.info(f"Diff truncated from {original_len} to {max_diff_len} chars")
-
-        review_prompt = load_template(
-            "review_prompt.md",
-            ISSUE_NUMBER=str(issue.number),
-            ISSUE_TITLE=issue.title,
-            ISSUE_BODY=issue.body,
-            GIT_DIFF=diff,
-            CHANGED_FILES="\n".join(changed_files),
-        )
-
-        # Prepend any visual QA findings from the after-screenshot review
-        # (only relevant for frontend issues that actually took screenshots)
-        visual_verdict = (
-            read_visual_verdict(SCREENSHOTS_DIR) if issue.is_frontend() else None
-        )
-        if visual_verdict:
-            logger.info(
-                f"Injecting visual verdict into review prompt: {visual_verdict.splitlines()[0]}"
-            )
-            review_prompt = (
-                f"## Visual QA (from after-screenshot review)\n"
-                f"{visual_verdict}\n\n"
-                f"If the visual QA flags a FEATURE_NOT_FOUND or ISSUE, treat that as strong "
-                f"signal that the fix may be incomplete or broken visually. "
-                f"Factor this into your verdict.\n\n"
-                f"---\n\n"
-            ) + review_prompt
-
-        # Run review
-        try:
-            result = reviewer.run(review_prompt, timeout=REVIEW_TIMEOUT, cwd=REPO_ROOT)
-            last_review_output = result.stdout
-        except ClineError as e:
-            logger.error(
-                f"Reviewer Cline crashed: {e}. Treating as LGTM (benefit of the doubt)."
-            )
-            visual_verdict = (
-                read_visual_verdict(SCREENSHOTS_DIR) if issue.is_frontend() else None
-            )
-            visual_section = (
-                f"\n\n### Visual QA\n{visual_verdict}" if visual_verdict else ""
-            )
+        if verdict is None:
+            logger.warning("No diff found. Marking as passed.")
             _safe_label_pr(pr_number, "review-passed")
             _safe_post_pr_comment(
                 pr_number,
                 format_review_summary(
-                    f"Reviewer failed to run (Cline error). Auto-approving.\n\nError: {e}{visual_section}"
+                    "No changes detected. Auto-approving."
                     + _build_cost_section(_cost_baseline),
                     "PASSED",
                 ),
             )
             return
 
-        verdict = parse_verdict(last_review_output)
-        logger.info(f"Review verdict: {verdict}")
-
         if verdict == "LGTM":
             logger.info("Review passed!")
-            visual_verdict = (
-                read_visual_verdict(SCREENSHOTS_DIR) if issue.is_frontend() else None
-            )
-            visual_section = (
-                f"\n\n### Visual QA\n{visual_verdict}" if visual_verdict else ""
-            )
+            visual_section = _visual_section(issue)
             _safe_label_pr(pr_number, "review-passed")
             _safe_post_pr_comment(
                 pr_number,
@@ -330,48 +670,35 @@ def main() -> None:
             logger.warning(
                 f"Review rejected. Applying fixes (iteration {iteration})..."
             )
-
-            fixer = ClineRunner(
-                cline_dir=REPO_ROOT / f".cline-fixer-{iteration}",
-                model=_cfg.models.fixer,
-                # No MCP settings — fixer uses CLI tools only, same as coding_cline.
-            )
-
-            fix_prompt = load_template(
-                "review_fix_prompt.md",
-                ISSUE_NUMBER=str(issue.number),
-                ISSUE_TITLE=issue.title,
-                ISSUE_BODY=issue.body,
-                REVIEW_FEEDBACK=last_review_output[:5000],
-            )
-
-            try:
-                fixer.run(fix_prompt, timeout=FIX_TIMEOUT, cwd=REPO_ROOT)
-            except ClineError as e:
-                logger.error(f"Fix attempt failed: {e}")
-
-            # Self-heal tests after fix
-            self_heal_loop(fixer, issue, max_attempts=_cfg.retries.max_heal_attempts)
-
-            # Commit and push fixes
-            try:
-                commit_and_push(
-                    f"fix(#{issue.number}): address review feedback (round {iteration})",
-                    branch,
-                )
-            except GitError as e:
-                logger.error(
-                    f"Commit/push after review fix failed (round {iteration}): {e}. "
-                    f"Cannot proceed — next review would see a stale diff. Stopping."
-                )
+            if fixer is None:
+                fixer = _make_fixer()
+            else:
+                fixer.reset_task_state()
+            if not _apply_review_fixes(fixer, iteration, issue, last_review_output):
                 break
+            # The push is network-bound; reset the reviewer while it runs.
+            # The diff is only refreshed once the push is done: a rejected push
+            # rebases, which moves HEAD and needs the index lock git diff takes.
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pushed = pool.submit(_push_fixes, iteration, branch)
+                reviewer.reset_task_state()
+                if not pushed.result():
+                    break
+            diff_cache.refresh()
+            # A fix that nets out to the same diff would only earn the same
+            # verdict — don't spend another reviewer run on it.
+            if diff_cache.digest == reviewed_digest:
+                logger.warning("No change since last review, aborting loop.")
+                break
+            # Rather than hold this runner through another review, queue it
+            if dispatch_to and _dispatch_next_review(
+                dispatch_to, issue, pr_number, branch, iteration + 1
+            ):
+                return
 
     # ── 3. Exhausted iterations ─────────────────────────────────
     logger.warning("Max review iterations reached. Posting final review.")
-    visual_verdict = (
-        read_visual_verdict(SCREENSHOTS_DIR) if issue.is_frontend() else None
-    )
-    visual_section = f"\n\n### Visual QA\n{visual_verdict}" if visual_verdict else ""
+    visual_section = _visual_section(issue)
     _safe_label_pr(pr_number, "review-needs-attention")
     _safe_post_pr_comment(
         pr_number,
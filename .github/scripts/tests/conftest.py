@@ -0,0 +1,9 @@
+"""Shared pytest setup for the agent script tests."""
+
+import sys
+from pathlib import Path
+
+# Make lib/ and the top-level scripts importable, once for the whole session
+_SCRIPTS_DIR = str(Path(__file__).parent.parent)
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
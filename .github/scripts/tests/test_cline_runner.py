@@ -1,22 +1,33 @@
 """Tests for cline_runner module."""
 
+import io
 import json
-import pytest
+import os
+import subprocess
 import sys
-from pathlib import Path
+import time
+import pytest
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+from lib import cline_runner
 from lib.cline_runner import (
     ClineRunner,
     ClineResult,
     ClineError,
     DEFAULT_COMMAND_PERMISSIONS,
     READ_ONLY_PERMISSIONS,
+    get_openrouter_usage,
+    _STUCK_PATTERNS,
+    _STUCK_RE,
+    _iter_line_batches,
 )
 
 
+def _pipe(*lines: str) -> io.BytesIO:
+    """Binary stand-in for a Popen stdout/stderr pipe."""
+    return io.BytesIO("".join(lines).encode())
+
+
 class TestClineResult:
     """Tests for ClineResult dataclass."""
 
@@ -80,6 +91,33 @@ class TestClineRunnerInit:
         assert dest.exists()
         assert json.loads(dest.read_text()) == {"mcpServers": {}}
 
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    def test_mcp_settings_copied_not_linked(self, mock_which, tmp_path):
+        cline_dir = tmp_path / "cline-test"
+        mcp_src = tmp_path / "mcp_settings.json"
+        mcp_src.write_text('{"mcpServers": {}}')
+
+        ClineRunner(cline_dir=cline_dir, model="test/model", mcp_settings_path=mcp_src)
+
+        dest = cline_dir / "data" / "settings" / "cline_mcp_settings.json"
+        assert not os.path.samefile(mcp_src, dest)
+        dest.write_text('{"mcpServers": {"cline": {}}}')
+        assert json.loads(mcp_src.read_text()) == {"mcpServers": {}}
+
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    def test_old_hardlink_replaced_by_copy(self, mock_which, tmp_path):
+        cline_dir = tmp_path / "cline-test"
+        mcp_src = tmp_path / "mcp_settings.json"
+        mcp_src.write_text('{"mcpServers": {}}')
+        dest = cline_dir / "data" / "settings" / "cline_mcp_settings.json"
+        dest.parent.mkdir(parents=True)
+        os.link(mcp_src, dest)
+
+        ClineRunner(cline_dir=cline_dir, model="test/model", mcp_settings_path=mcp_src)
+
+        assert not os.path.samefile(mcp_src, dest)
+        assert json.loads(dest.read_text()) == {"mcpServers": {}}
+
     @patch("shutil.which", return_value="/usr/bin/cline")
     def test_overwrites_mcp_settings_on_reinit(self, mock_which, tmp_path):
         """MCP settings should always be overwritten, not skipped if already exist."""
@@ -97,6 +135,20 @@ class TestClineRunnerInit:
         dest = cline_dir / "data" / "settings" / "cline_mcp_settings.json"
         assert json.loads(dest.read_text()) == {"mcpServers": {"new": {}}}
 
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    def test_secrets_file_owner_only(self, mock_which, tmp_path, monkeypatch):
+        monkeypatch.setenv("OPENROUTER_API_KEY", "sk-test")
+        cline_dir = tmp_path / "cline-test"
+        secrets = cline_dir / "data" / "secrets.json"
+        secrets.parent.mkdir(parents=True)
+        secrets.write_text("{}")
+        secrets.chmod(0o644)
+
+        ClineRunner(cline_dir=cline_dir, model="test/model")
+
+        assert json.loads(secrets.read_text()) == {"openRouterApiKey": "sk-test"}
+        assert secrets.stat().st_mode & 0o777 == 0o600
+
     @patch("shutil.which", return_value="/usr/bin/cline")
     def test_overwrites_global_state_on_reinit(self, mock_which, tmp_path):
         """globalState.json should always reflect the current model, not be cached."""
@@ -113,6 +165,37 @@ class TestClineRunnerInit:
             json.loads(state_path.read_text())["actModeOpenRouterModelId"] == "model-v2"
         )
 
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    def test_unchanged_config_not_rewritten(self, mock_which, tmp_path):
+        cline_dir = tmp_path / "cline-test"
+        mcp_src = tmp_path / "mcp_settings.json"
+        mcp_src.write_text('{"mcpServers": {}}')
+        ClineRunner(cline_dir=cline_dir, model="test/model", mcp_settings_path=mcp_src)
+        written = [
+            cline_dir / "data" / "globalState.json",
+            cline_dir / "data" / "settings" / "cline_mcp_settings.json",
+        ]
+        for path in written:
+            os.utime(path, ns=(0, 0))
+
+        ClineRunner(cline_dir=cline_dir, model="test/model", mcp_settings_path=mcp_src)
+
+        assert all(path.stat().st_mtime_ns == 0 for path in written)
+
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    def test_reset_task_state_keeps_config(self, mock_which, tmp_path):
+        cline_dir = tmp_path / "cline"
+        runner = ClineRunner(cline_dir=cline_dir, model="test/model")
+        tasks_dir = cline_dir / "data" / "tasks" / "123"
+        tasks_dir.mkdir(parents=True)
+        (tasks_dir / "api_conversation_history.json").write_text("[]")
+
+        runner.reset_task_state()
+
+        assert not (cline_dir / "data" / "tasks").exists()
+        assert (cline_dir / "data" / "globalState.json").exists()
+        runner.reset_task_state()  # no tasks dir — must not raise
+
     @patch("shutil.which", return_value="/usr/bin/cline")
     def test_default_permissions(self, mock_which, tmp_path):
         runner = ClineRunner(cline_dir=tmp_path / "c", model="test/model")
@@ -145,8 +228,8 @@ class TestClineRunnerRun:
         mock_proc = MagicMock()
         mock_proc.poll.side_effect = [None, 0]
         mock_proc.returncode = 0
-        mock_proc.stdout = iter(["task completed\n"])
-        mock_proc.stderr = iter([])
+        mock_proc.stdout = _pipe("task completed\n")
+        mock_proc.stderr = _pipe()
         mock_proc.wait.return_value = 0
         mock_popen.return_value = mock_proc
 
@@ -173,8 +256,8 @@ class TestClineRunnerRun:
         mock_proc = MagicMock()
         mock_proc.poll.side_effect = [None, 1]
         mock_proc.returncode = 1
-        mock_proc.stdout = iter(["partial output\n"])
-        mock_proc.stderr = iter(["something went wrong\n"])
+        mock_proc.stdout = _pipe("partial output\n")
+        mock_proc.stderr = _pipe("something went wrong\n")
         mock_proc.wait.return_value = 1
         mock_popen.return_value = mock_proc
 
@@ -185,6 +268,46 @@ class TestClineRunnerRun:
         assert exc_info.value.exit_code == 1
         assert "something went wrong" in exc_info.value.stderr
 
+    @patch("time.sleep")
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    @patch("subprocess.Popen")
+    def test_records_first_marker_line(
+        self, mock_popen, mock_which, mock_sleep, tmp_path
+    ):
+        mock_proc = MagicMock()
+        mock_proc.poll.side_effect = [None, 0]
+        mock_proc.returncode = 0
+        mock_proc.stdout = _pipe(
+            "reviewing...\n", "**Verdict:** LGTM\n", "Verdict: NEEDS CHANGES\n"
+        )
+        mock_proc.stderr = _pipe("Verdict: NEEDS CHANGES\n")
+        mock_proc.wait.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        runner = ClineRunner(cline_dir=tmp_path / "c", model="test/model")
+        result = runner.run("Review", marker=r"verdict\W*:\W*(lgtm|needs changes)")
+
+        assert result.marker_line == "**Verdict:** LGTM"
+
+    @patch("time.sleep")
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    @patch("subprocess.Popen")
+    def test_marker_line_none_without_marker(
+        self, mock_popen, mock_which, mock_sleep, tmp_path
+    ):
+        mock_proc = MagicMock()
+        mock_proc.poll.side_effect = [None, 0]
+        mock_proc.returncode = 0
+        mock_proc.stdout = _pipe("Verdict: LGTM\n")
+        mock_proc.stderr = _pipe()
+        mock_proc.wait.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        runner = ClineRunner(cline_dir=tmp_path / "c", model="test/model")
+        result = runner.run("Review")
+
+        assert result.marker_line is None
+
     @patch("shutil.which", return_value="/usr/bin/cline")
     @patch("subprocess.Popen")
     def test_timeout_raises(self, mock_popen, mock_which, tmp_path):
@@ -197,12 +320,16 @@ class TestClineRunnerRun:
     @patch("time.sleep")
     @patch("shutil.which", return_value="/usr/bin/cline")
     @patch("subprocess.Popen")
-    def test_sets_env_vars(self, mock_popen, mock_which, mock_sleep, tmp_path):
+    def test_sets_env_vars(
+        self, mock_popen, mock_which, mock_sleep, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("GITHUB_TOKEN", "ghs_secret")
+        monkeypatch.setenv("CI", "true")
         mock_proc = MagicMock()
         mock_proc.poll.side_effect = [None, 0]
         mock_proc.returncode = 0
-        mock_proc.stdout = iter(["ok\n"])
-        mock_proc.stderr = iter([])
+        mock_proc.stdout = _pipe("ok\n")
+        mock_proc.stderr = _pipe()
         mock_proc.wait.return_value = 0
         mock_popen.return_value = mock_proc
 
@@ -214,6 +341,34 @@ class TestClineRunnerRun:
         env = call_args[1]["env"]
         assert env["CLINE_DIR"] == str(cline_dir)
         assert "CLINE_COMMAND_PERMISSIONS" in env
+        assert env["CI"] == "true"
+        assert "GITHUB_TOKEN" not in env
+
+    @patch("time.sleep")
+    @patch("shutil.which", return_value="/usr/bin/cline")
+    @patch("subprocess.Popen")
+    def test_permissions_env_matches_json_dumps(
+        self, mock_popen, mock_which, mock_sleep, tmp_path
+    ):
+        mock_proc = MagicMock()
+        mock_proc.poll.side_effect = [None, 0] * 3
+        mock_proc.returncode = 0
+        mock_proc.stdout = _pipe()
+        mock_proc.stderr = _pipe()
+        mock_popen.return_value = mock_proc
+        custom = {"allow": ["ls *"], "deny": [], "allowRedirects": False}
+
+        for perms in (READ_ONLY_PERMISSIONS, custom):
+            runner = ClineRunner(
+                cline_dir=tmp_path / "c", model="m", command_permissions=perms
+            )
+            runner.run("p")
+            env = mock_popen.call_args[1]["env"]
+            assert env["CLINE_COMMAND_PERMISSIONS"] == json.dumps(perms)
+
+        with patch("json.dumps") as mock_dumps:
+            runner.run("p")
+        mock_dumps.assert_not_called()
 
     @patch("time.sleep")
     @patch("shutil.which", return_value="/usr/bin/cline")
@@ -225,8 +380,8 @@ class TestClineRunnerRun:
         mock_proc = MagicMock()
         mock_proc.poll.side_effect = [None, 0]
         mock_proc.returncode = 0
-        mock_proc.stdout = iter(["done\n"])
-        mock_proc.stderr = iter([])
+        mock_proc.stdout = _pipe("done\n")
+        mock_proc.stderr = _pipe()
         mock_proc.wait.return_value = 0
         mock_popen.return_value = mock_proc
 
@@ -250,8 +405,8 @@ class TestClineRunnerRun:
         mock_proc = MagicMock()
         mock_proc.poll.side_effect = [None, 0]
         mock_proc.returncode = 0
-        mock_proc.stdout = iter(["done\n"])
-        mock_proc.stderr = iter([])
+        mock_proc.stdout = _pipe("done\n")
+        mock_proc.stderr = _pipe()
         mock_proc.wait.return_value = 0
         mock_popen.return_value = mock_proc
 
@@ -262,6 +417,183 @@ class TestClineRunnerRun:
         assert "-p" not in cmd
 
 
+class TestClineRunnerWait:
+    """run() against a real child process standing in for the cline binary."""
+
+    @pytest.fixture
+    def runner_for(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+        real_popen = subprocess.Popen
+
+        def make(script: str) -> ClineRunner:
+            def fake_popen(cmd, **kwargs):
+                self.cmd = cmd
+                return real_popen([sys.executable, "-c", script], **kwargs)
+
+            monkeypatch.setattr(subprocess, "Popen", fake_popen)
+            with patch("shutil.which", return_value="/usr/bin/cline"):
+                return ClineRunner(cline_dir=tmp_path / "c", model="test/model")
+
+        return make
+
+    def test_returns_as_soon_as_child_exits(self, runner_for):
+        runner = runner_for("print('done')")
+        start = time.monotonic()
+        result = runner.run("Fix the bug")
+        assert result.stdout == "done"
+        assert time.monotonic() - start < 0.9
+
+    def test_output_joined_like_lines(self, runner_for):
+        runner = runner_for(
+            "import sys; print('a', flush=True); print(); print('b');"
+            " sys.stderr.write('warn\\n')"
+        )
+        result = runner.run("Fix the bug")
+        assert result.stdout == "a\n\nb"
+        assert result.stderr == "warn"
+
+    def test_usage_baseline_fetched_while_cline_runs(self, runner_for, monkeypatch):
+        def slow_baseline():
+            time.sleep(0.3)
+            return 1.0
+
+        monkeypatch.setattr(cline_runner, "_get_openrouter_usage", slow_baseline)
+        # The final reading must bypass the cache that holds the baseline
+        monkeypatch.setattr(
+            cline_runner,
+            "get_openrouter_usage",
+            lambda fresh=False: 1.5 if fresh else 1.0,
+        )
+        runner = runner_for("import time; time.sleep(0.3)")
+        start = time.monotonic()
+        result = runner.run("Fix the bug")
+        assert time.monotonic() - start < 0.55
+        assert result.cost_usd == pytest.approx(0.5)
+
+    def test_long_prompt_sent_on_stdin(self, runner_for):
+        runner = runner_for("import sys; print(len(sys.stdin.read()))")
+        prompt = "x" * cline_runner._ARGV_PROMPT_MAX_BYTES
+        result = runner.run(prompt)
+        assert result.stdout == str(len(prompt))
+        assert prompt not in self.cmd
+
+    def test_short_prompt_stays_on_argv(self, runner_for):
+        runner = runner_for("print('done')")
+        runner.run("Fix the bug")
+        assert self.cmd[-1] == "Fix the bug"
+
+    def test_stuck_pattern_kills_without_waiting_for_exit(self, runner_for):
+        runner = runner_for(
+            "import time; print('Press Enter to continue', flush=True); time.sleep(60)"
+        )
+        start = time.monotonic()
+        with pytest.raises(ClineError, match="appears stuck"):
+            runner.run("Fix the bug")
+        assert time.monotonic() - start < 5
+
+
+class TestGetOpenrouterUsage:
+    """Tests for get_openrouter_usage() connection reuse and caching."""
+
+    @pytest.fixture
+    def https(self, monkeypatch):
+        monkeypatch.setenv("OPENROUTER_API_KEY", "sk-test")
+        monkeypatch.setattr(cline_runner, "_usage_conn", None)
+        monkeypatch.setattr(cline_runner, "_usage_cache", None)
+        conn = MagicMock()
+        conn.getresponse.return_value = MagicMock(
+            status=200, read=MagicMock(return_value=b'{"data": {"usage": 1.25}}')
+        )
+        factory = MagicMock(return_value=conn)
+        monkeypatch.setattr(cline_runner.http.client, "HTTPSConnection", factory)
+        return factory, conn
+
+    def test_none_without_api_key(self, monkeypatch):
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+        assert get_openrouter_usage() is None
+
+    def test_reading_reused_within_ttl(self, https):
+        factory, conn = https
+        assert get_openrouter_usage() == 1.25
+        assert get_openrouter_usage() == 1.25
+        assert conn.request.call_count == 1
+
+    def test_fresh_reading_skips_cache(self, https):
+        factory, conn = https
+        assert get_openrouter_usage() == 1.25
+        conn.getresponse.return_value.read.return_value = b'{"data": {"usage": 2.0}}'
+        assert get_openrouter_usage(fresh=True) == 2.0
+        assert conn.request.call_count == 2
+        # ...and refreshes it for the readings that follow
+        assert get_openrouter_usage() == 2.0
+
+    def test_connection_kept_across_fetches(self, https, monkeypatch):
+        factory, conn = https
+        monkeypatch.setattr(cline_runner, "_USAGE_TTL_SECONDS", 0)
+        get_openrouter_usage()
+        get_openrouter_usage()
+        assert factory.call_count == 1
+        assert conn.request.call_count == 2
+
+    def test_stale_connection_retried_once(self, https):
+        factory, conn = https
+        conn.request.side_effect = [ConnectionResetError("closed"), None]
+        assert get_openrouter_usage() == 1.25
+        assert factory.call_count == 2
+
+    def test_http_error_returns_none(self, https):
+        _, conn = https
+        conn.getresponse.return_value = MagicMock(
+            status=401, read=MagicMock(return_value=b"")
+        )
+        assert get_openrouter_usage() is None
+
+
+def _iter_lines(stream):
+    return [line for batch in _iter_line_batches(stream) for line in batch]
+
+
+class TestIterLineBatches:
+    class _ChunkedPipe:
+        """Pipe whose read1() hands back fixed chunks, like a busy stream."""
+
+        def __init__(self, *chunks: bytes):
+            self._chunks = list(chunks)
+
+        def read1(self, size: int) -> bytes:
+            return self._chunks.pop(0) if self._chunks else b""
+
+    def test_lines_split_across_chunks(self):
+        pipe = self._ChunkedPipe(b"first li", b"ne\nsecond\nthi", b"rd")
+        assert _iter_lines(pipe) == ["first line", "second", "third"]
+
+    def test_crlf_split_across_chunks_is_one_line_ending(self):
+        pipe = self._ChunkedPipe(b"one\r", b"\ntwo\rthree\r\n")
+        assert _iter_lines(pipe) == ["one", "two", "three"]
+
+    def test_multibyte_character_split_across_chunks(self):
+        data = "caf\u00e9 \u2713\n".encode()
+        pipe = self._ChunkedPipe(data[:4], data[4:])
+        assert _iter_lines(pipe) == ["caf\u00e9 \u2713"]
+
+    def test_one_batch_per_read(self):
+        pipe = self._ChunkedPipe(b"a\nb\nc", b"\nd\n")
+        assert list(_iter_line_batches(pipe)) == [["a", "b"], ["c", "d"]]
+
+    def test_invalid_utf8_replaced(self):
+        assert _iter_lines(self._ChunkedPipe(b"bad \xff\n")) == ["bad \ufffd"]
+
+
+class TestStuckPatterns:
+    @pytest.mark.parametrize("pattern", _STUCK_PATTERNS)
+    def test_each_pattern_matches_case_insensitively(self, pattern):
+        assert _STUCK_RE.search(f"> {pattern.upper()} ...")
+        assert _STUCK_RE.search(f"> {pattern.lower()} ...")
+
+    def test_ordinary_output_does_not_match(self):
+        assert not _STUCK_RE.search("Running npm test (y/n answers not needed)")
+
+
 class TestPermissionConstants:
     """Tests for permission constants."""
 
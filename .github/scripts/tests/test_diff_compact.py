@@ -0,0 +1,136 @@
+"""Tests for diff_compact module."""
+
+from lib.diff_compact import (
+    TRUNCATION_MARKER,
+    compact_diff,
+    file_diff_path,
+    is_generated_path,
+    removes_path,
+    split_file_diffs,
+)
+
+
+def _file_diff(path: str, added: int, removed: int = 0) -> str:
+    body = "".join(f"-old {i}\n" for i in range(removed))
+    body += "".join(f"+new {i}\n" for i in range(added))
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"index 1111111..2222222 100644\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        f"@@ -1,{removed} +1,{added} @@\n"
+        f"{body}"
+    )
+
+
+class TestSplitFileDiffs:
+    """Tests for split_file_diffs() and file_diff_path()."""
+
+    def test_splits_on_file_headers(self):
+        raw = _file_diff("a.js", 1) + _file_diff("b.js", 2)
+        chunks = split_file_diffs(raw)
+        assert [file_diff_path(c) for c in chunks] == ["a.js", "b.js"]
+        assert "".join(chunks) == raw
+
+    def test_empty_input(self):
+        assert split_file_diffs("") == []
+
+    def test_path_for_non_diff_text(self):
+        assert file_diff_path("not a diff") == ""
+
+    def test_quoted_non_ascii_path(self):
+        chunk = 'diff --git "a/\\303\\251.txt" "b/\\303\\251.txt"\n'
+        assert file_diff_path(chunk) == "é.txt"
+
+    def test_quoted_escapes(self):
+        chunk = 'diff --git "a/q\\"x\\\\y.txt" "b/q\\"x\\\\y.txt"\n'
+        assert file_diff_path(chunk) == 'q"x\\y.txt'
+
+    def test_path_containing_b_slash(self):
+        chunk = "diff --git a/sp ace b/x.txt b/sp ace b/x.txt\n"
+        assert file_diff_path(chunk) == "sp ace b/x.txt"
+
+    def test_rename_uses_rename_to(self):
+        chunk = (
+            'diff --git a/old.txt "b/\\303\\261ew.txt"\n'
+            "similarity index 100%\n"
+            "rename from old.txt\n"
+            'rename to "\\303\\261ew.txt"\n'
+        )
+        assert file_diff_path(chunk) == "ñew.txt"
+
+    def test_ambiguous_header(self):
+        assert file_diff_path("diff --git a/x.txt b/y.txt\n") == ""
+
+
+class TestRemovesPath:
+    """Tests for removes_path()."""
+
+    def test_modification(self):
+        assert not removes_path(_file_diff("app.js", 2, 1))
+
+    def test_deletion(self):
+        chunk = "diff --git a/z.txt b/z.txt\ndeleted file mode 100644\n"
+        assert removes_path(chunk)
+
+    def test_rename(self):
+        chunk = "diff --git a/a b/b\nrename from a\nrename to b\n"
+        assert removes_path(chunk)
+
+
+class TestIsGeneratedPath:
+    """Tests for is_generated_path()."""
+
+    def test_lockfiles(self):
+        assert is_generated_path("package-lock.json")
+        assert is_generated_path("backend/package-lock.json")
+        assert is_generated_path("yarn.lock")
+        assert is_generated_path("backend/Cargo.lock")
+
+    def test_minified_and_build_output(self):
+        assert is_generated_path("frontend/app.min.js")
+        assert is_generated_path("dist/bundle.js")
+        assert is_generated_path("api/schema.generated.ts")
+
+    def test_source_files(self):
+        assert not is_generated_path("frontend/app.js")
+        assert not is_generated_path("backend/server.js")
+        assert not is_generated_path("docs/distribution.md")
+
+
+class TestCompactDiff:
+    """Tests for compact_diff()."""
+
+    def test_small_diff_unchanged(self):
+        raw = _file_diff("app.js", 3)
+        assert compact_diff(raw, budget=30000) == raw
+
+    def test_lockfile_collapsed_to_summary(self):
+        raw = _file_diff("package-lock.json", 40, 12) + _file_diff("app.js", 2)
+        result = compact_diff(raw, budget=len(raw) - 1)
+        assert "diff --git a/package-lock.json b/package-lock.json" in result
+        assert "# compacted: +40 -12 lines" in result
+        assert "+new 39" not in result
+        assert _file_diff("app.js", 2) in result
+
+    def test_real_changes_survive_a_large_lockfile(self):
+        raw = _file_diff("package-lock.json", 5000) + _file_diff("server.js", 3)
+        result = compact_diff(raw, budget=2000)
+        assert "+new 2" in result
+        assert TRUNCATION_MARKER not in result
+
+    def test_per_file_line_cap(self):
+        raw = _file_diff("big.js", 100)
+        result = compact_diff(raw, budget=len(raw) - 1, max_file_lines=20)
+        assert len(result.splitlines()) == 21
+        assert "# ... 85 more lines in this file" in result
+
+    def test_fitting_diff_sent_whole(self):
+        raw = _file_diff("package-lock.json", 40) + _file_diff("big.js", 800)
+        assert compact_diff(raw, budget=len(raw), max_file_lines=500) == raw
+
+    def test_budget_enforced(self):
+        raw = "".join(_file_diff(f"f{i}.js", 50) for i in range(20))
+        result = compact_diff(raw, budget=1000)
+        assert result.endswith(TRUNCATION_MARKER)
+        assert len(result) == 1000 + len(TRUNCATION_MARKER)
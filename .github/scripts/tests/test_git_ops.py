@@ -1,23 +1,53 @@
 """Tests for git_ops module."""
 
 import pytest
-import sys
-from pathlib import Path
+import subprocess
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+from lib import git_ops
 from lib.git_ops import (
     create_branch,
+    commit_all,
     commit_and_push,
     create_pr,
+    dispatch_workflow,
+    push_branch,
     get_pr_number,
     get_diff,
     get_changed_files,
+    get_files_changed_since,
     GitError,
 )
 
 
+@pytest.fixture
+def mock_git(monkeypatch):
+    """Replace _run_git for one test; real-repo tests simply don't request it."""
+    mock = MagicMock()
+    monkeypatch.setattr(git_ops, "_run_git", mock)
+    return mock
+
+
+class _GitResult:
+    """Slotted stand-in for the CompletedProcess returned by _run_git."""
+
+    __slots__ = ("stdout", "returncode", "stderr")
+
+    def __init__(self, stdout: str = "", returncode: int = 0, stderr: str = ""):
+        self.stdout = stdout
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+def _git_calls(mock) -> frozenset:
+    """Argument lists of every call made to a mocked _run_git, as tuples."""
+    return frozenset(tuple(c.args[0]) for c in mock.call_args_list)
+
+
+# Shared "succeeded, printed nothing" result for side_effect lookup tables
+_NO_OUTPUT = _GitResult()
+
+
 class TestCreateBranch:
     """Tests for create_branch()."""
 
@@ -29,58 +59,45 @@ class TestCreateBranch:
         with pytest.raises(ValueError, match="empty"):
             create_branch(None)
 
-    @patch("lib.git_ops._run_git")
     def test_calls_git_checkout_new_branch(self, mock_git):
         """When branch does not exist on remote, should create it with -b."""
 
-        def side_effect(args, check=True):
-            result = MagicMock()
-            result.returncode = 0
-            # ls-remote returns empty stdout → branch does not exist remotely
-            if args[0] == "ls-remote":
-                result.stdout = ""
-            else:
-                result.stdout = ""
-            return result
-
-        mock_git.side_effect = side_effect
+        # ls-remote returns empty stdout → branch does not exist remotely
+        responses = {
+            "fetch": _GitResult(),
+            "ls-remote": _GitResult(),
+            "checkout": _GitResult(),
+        }
+        mock_git.side_effect = lambda args, check=True: responses[args[0]]
         actual_branch = create_branch("ralph/issue-42")
 
         assert actual_branch == "ralph/issue-42"
-        calls = [c.args[0] for c in mock_git.call_args_list]
-        assert ["fetch", "origin"] in calls
-        assert ["ls-remote", "--heads", "origin", "ralph/issue-42"] in calls
-        assert ["checkout", "-b", "ralph/issue-42"] in calls
+        observed = _git_calls(mock_git)
+        assert ("fetch", "origin") in observed
+        assert ("ls-remote", "--heads", "origin", "ralph/issue-42") in observed
+        assert ("checkout", "-b", "ralph/issue-42") in observed
 
-    @patch("lib.git_ops._run_git")
     def test_creates_versioned_branch_when_base_exists(self, mock_git):
         """When branch already exists on remote, should create -v2 version."""
 
+        exists = _GitResult(stdout="abc123\trefs/heads/ralph/issue-42\n")
+
         def side_effect(args, check=True):
-            result = MagicMock()
-            result.returncode = 0
-            if args[0] == "ls-remote":
-                # First call: base branch exists
-                # Second call: -v2 does not exist
-                if "ralph/issue-42-v2" in args:
-                    result.stdout = ""
-                else:
-                    result.stdout = "abc123\trefs/heads/ralph/issue-42\n"
-            else:
-                result.stdout = ""
-            return result
+            # First ls-remote: base branch exists; second: -v2 does not
+            if args[0] == "ls-remote" and "ralph/issue-42-v2" not in args:
+                return exists
+            return _NO_OUTPUT
 
         mock_git.side_effect = side_effect
         actual_branch = create_branch("ralph/issue-42")
 
         assert actual_branch == "ralph/issue-42-v2"
-        calls = [c.args[0] for c in mock_git.call_args_list]
-        assert ["checkout", "-b", "ralph/issue-42-v2"] in calls
+        observed = _git_calls(mock_git)
+        assert ("checkout", "-b", "ralph/issue-42-v2") in observed
         # Should NOT try to checkout/reset the existing branch
-        assert ["checkout", "ralph/issue-42"] not in calls
-        assert ["reset", "--hard", "origin/ralph/issue-42"] not in calls
+        assert ("checkout", "ralph/issue-42") not in observed
+        assert ("reset", "--hard", "origin/ralph/issue-42") not in observed
 
-    @patch("lib.git_ops._run_git")
     def test_git_failure_raises(self, mock_git):
         mock_git.side_effect = GitError("branch exists", exit_code=128)
         with pytest.raises(GitError):
@@ -98,117 +115,100 @@ class TestCommitAndPush:
         with pytest.raises(ValueError, match="Branch name"):
             commit_and_push("message", "")
 
-    @patch("lib.git_ops._run_git")
     def test_no_changes_raises(self, mock_git):
         """If git status --porcelain returns empty, should raise GitError."""
 
-        def side_effect(args, check=True):
-            result = MagicMock()
-            if args[0] == "status":
-                result.stdout = ""
-                result.returncode = 0
-            else:
-                result.stdout = ""
-                result.returncode = 0
-            return result
-
-        mock_git.side_effect = side_effect
+        mock_git.return_value = _NO_OUTPUT
 
         with pytest.raises(GitError, match="No changes"):
             commit_and_push("fix stuff", "ralph/issue-1")
 
-    @patch("lib.git_ops._run_git")
     def test_successful_commit_and_push(self, mock_git):
         """Should call git add, check status, commit, and push (check=False)."""
 
-        def side_effect(args, check=True):
-            result = MagicMock()
-            result.returncode = 0
-            result.stdout = "M server.js\n" if args[0] == "status" else ""
-            result.stderr = ""
-            return result
-
-        mock_git.side_effect = side_effect
+        responses = {
+            "add": _GitResult(),
+            "diff": _GitResult(),
+            "status": _GitResult(stdout="M server.js\n"),
+            "commit": _GitResult(),
+            "push": _GitResult(),
+        }
+        mock_git.side_effect = lambda args, check=True: responses[args[0]]
         commit_and_push("fix bug", "ralph/issue-1")
 
-        calls = [c.args[0] for c in mock_git.call_args_list]
-        assert ["add", "-A"] in calls
-        assert ["status", "--porcelain"] in calls
-        assert ["commit", "-m", "fix bug"] in calls
-        assert ["push", "origin", "ralph/issue-1"] in calls
+        observed = _git_calls(mock_git)
+        assert ("add", "-A") in observed
+        assert ("status", "--porcelain") in observed
+        assert ("commit", "-m", "fix bug") in observed
+        assert ("push", "origin", "ralph/issue-1") in observed
 
-    @patch("lib.git_ops._run_git")
     def test_push_retries_after_non_fast_forward(self, mock_git):
         """On non-fast-forward push rejection, should pull --rebase then retry push."""
+        responses = {
+            "status": _GitResult(stdout="M server.js\n"),
+            "push": _GitResult(),
+        }
+        rejected = _GitResult(returncode=1, stderr="! [rejected] non-fast-forward")
         push_attempt = 0
 
         def side_effect(args, check=True):
             nonlocal push_attempt
-            result = MagicMock()
-            result.stdout = "M server.js\n" if args[0] == "status" else ""
-            result.stderr = ""
             if args[0] == "push":
                 push_attempt += 1
                 if push_attempt == 1:
-                    # First push attempt: rejected
-                    result.returncode = 1
-                    result.stderr = "! [rejected] non-fast-forward"
-                else:
-                    result.returncode = 0
-            else:
-                result.returncode = 0
-            return result
+                    return rejected
+            return responses.get(args[0], _NO_OUTPUT)
 
         mock_git.side_effect = side_effect
         commit_and_push("fix bug", "ralph/issue-1")
 
-        calls = [c.args[0] for c in mock_git.call_args_list]
+        observed = _git_calls(mock_git)
         # Should have attempted a pull --rebase after rejection
-        assert ["pull", "--rebase", "origin", "ralph/issue-1"] in calls
+        assert ("pull", "--rebase", "origin", "ralph/issue-1") in observed
         # And pushed a second time
         assert push_attempt == 2
 
-    @patch("lib.git_ops._run_git")
     def test_non_fast_forward_raises_after_rebase_fails(self, mock_git):
         """If the retry push also fails, should raise GitError."""
+        responses = {"status": _GitResult(stdout="M server.js\n")}
+        rejected = _GitResult(returncode=1, stderr="! [rejected] non-fast-forward")
+        push_attempt = 0
 
         def side_effect(args, check=True):
-            result = MagicMock()
-            result.stdout = "M server.js\n" if args[0] == "status" else ""
-            if args[0] == "push":
-                result.returncode = 1
-                result.stderr = "! [rejected] non-fast-forward"
-            elif check is False:
-                result.returncode = 0
-                result.stderr = ""
-            else:
-                result.returncode = 0
-                result.stderr = ""
-            return result
-
-        # Make the second push (after rebase) also fail — _run_git with check=True raises
-        call_count = {"push": 0}
-
-        def side_effect2(args, check=True):
-            result = MagicMock()
-            result.stdout = "M server.js\n" if args[0] == "status" else ""
-            result.stderr = ""
-            result.returncode = 0
+            nonlocal push_attempt
             if args[0] == "push":
-                call_count["push"] += 1
-                if call_count["push"] == 1:
-                    result.returncode = 1
-                    result.stderr = "! [rejected] non-fast-forward"
-                else:
-                    # Second push (check=True default) raises via _run_git
-                    raise GitError("push failed again", exit_code=1)
-            return result
-
-        mock_git.side_effect = side_effect2
+                push_attempt += 1
+                if push_attempt == 1:
+                    return rejected
+                # Second push (check=True default) raises via _run_git
+                raise GitError("push failed again", exit_code=1)
+            return responses.get(args[0], _NO_OUTPUT)
+
+        mock_git.side_effect = side_effect
         with pytest.raises(GitError):
             commit_and_push("fix bug", "ralph/issue-1")
 
 
+class TestCommitAllAndPushBranch:
+    """Tests for the commit_all() / push_branch() halves of commit_and_push()."""
+
+    def test_commit_all_does_not_push(self, mock_git):
+        mock_git.return_value = _GitResult(stdout="M server.js\n")
+        commit_all("fix bug")
+        observed = _git_calls(mock_git)
+        assert ("commit", "-m", "fix bug") in observed
+        assert not any(c[0] == "push" for c in observed)
+
+    def test_push_branch_only_pushes(self, mock_git):
+        mock_git.return_value = _GitResult()
+        push_branch("ralph/issue-1")
+        mock_git.assert_called_once_with(["push", "origin", "ralph/issue-1"], check=False)
+
+    def test_push_branch_empty_raises(self):
+        with pytest.raises(ValueError, match="Branch name"):
+            push_branch(" ")
+
+
 class TestCreatePr:
     """Tests for create_pr()."""
 
@@ -220,18 +220,15 @@ class TestCreatePr:
         with pytest.raises(ValueError, match="head"):
             create_pr("title", "body", "main", "")
 
-    @patch("lib.git_ops._run_gh")
+    @patch.object(git_ops, "_run_gh")
     def test_returns_pr_url(self, mock_gh):
-        mock_gh.return_value = MagicMock(
-            stdout="https://github.com/user/repo/pull/42\n",
-            returncode=0,
-        )
+        mock_gh.return_value = _GitResult(stdout="https://github.com/user/repo/pull/42\n")
         url = create_pr("Fix bug", "Description", "main", "ralph/issue-42")
         assert url == "https://github.com/user/repo/pull/42"
 
-    @patch("lib.git_ops._run_gh")
+    @patch.object(git_ops, "_run_gh")
     def test_empty_url_raises(self, mock_gh):
-        mock_gh.return_value = MagicMock(stdout="", returncode=0)
+        mock_gh.return_value = _GitResult()
         with pytest.raises(GitError, match="no URL"):
             create_pr("Fix bug", "Description", "main", "ralph/issue-42")
 
@@ -249,24 +246,87 @@ class TestGetPrNumber:
 class TestGetDiff:
     """Tests for get_diff()."""
 
-    @patch("lib.git_ops._run_git")
     def test_returns_diff_string(self, mock_git):
-        mock_git.return_value = MagicMock(stdout="diff --git a/file.js b/file.js\n")
+        mock_git.return_value = _GitResult(stdout="diff --git a/file.js b/file.js\n")
         result = get_diff("main")
         assert "diff --git" in result
 
+    def test_limits_to_paths(self, mock_git):
+        mock_git.return_value = _GitResult()
+        get_diff("main", paths=["a.js", "b.js"])
+        mock_git.assert_called_once_with(
+            ["diff", "main...HEAD", "--", ":(literal)a.js", ":(literal)b.js"]
+        )
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=str(repo),
+        check=True,
+        capture_output=True,
+    )
+
+
+class TestGetDiffCapped:
+    """Tests for get_diff(max_bytes=...) against a real repository."""
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        _git(tmp_path, "init", "-q", "-b", "main")
+        (tmp_path / "a.txt").write_text("one\n", encoding="utf-8")
+        _git(tmp_path, "add", "a.txt")
+        _git(tmp_path, "commit", "-q", "-m", "init")
+        _git(tmp_path, "checkout", "-q", "-b", "feature")
+        (tmp_path / "a.txt").write_text("".join(f"line {i}\n" for i in range(5000)))
+        _git(tmp_path, "commit", "-q", "-am", "grow")
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_small_budget_truncates(self, repo):
+        diff = get_diff("main", max_bytes=1000)
+        assert diff.startswith("diff --git a/a.txt b/a.txt")
+        assert len(diff) == 1000
+
+    def test_large_budget_matches_uncapped(self, repo):
+        assert get_diff("main", max_bytes=10_000_000) == get_diff("main")
+
+    def test_git_failure_raises(self, repo):
+        with pytest.raises(GitError, match="failed"):
+            get_diff("no-such-branch", max_bytes=1000)
+
+
+class TestGetFilesChangedSince:
+    """Tests for get_files_changed_since()."""
+
+    def test_lists_files_without_rename_pairing(self, mock_git):
+        mock_git.return_value = _GitResult(stdout="old.js\0new.js\0")
+        assert get_files_changed_since("abc123") == ["old.js", "new.js"]
+        args = mock_git.call_args[0][0]
+        assert args[-2:] == ["abc123", "HEAD"]
+        assert "--no-renames" in args
+
 
 class TestGetChangedFiles:
     """Tests for get_changed_files()."""
 
-    @patch("lib.git_ops._run_git")
     def test_returns_file_list(self, mock_git):
-        mock_git.return_value = MagicMock(stdout="server.js\napp.js\n")
+        mock_git.return_value = _GitResult(stdout="server.js\napp.js\n")
         files = get_changed_files("main")
         assert files == ["server.js", "app.js"]
 
-    @patch("lib.git_ops._run_git")
     def test_empty_diff_returns_empty_list(self, mock_git):
-        mock_git.return_value = MagicMock(stdout="")
+        mock_git.return_value = _GitResult()
         files = get_changed_files("main")
         assert files == []
+
+
+class TestDispatchWorkflow:
+    """Tests for dispatch_workflow()."""
+
+    @patch.object(git_ops, "_run_gh")
+    def test_passes_inputs_as_fields(self, mock_gh):
+        dispatch_workflow("review.yml", {"pr_number": "5", "iteration": "2"})
+        mock_gh.assert_called_once_with(
+            ["workflow", "run", "review.yml", "-f", "pr_number=5", "-f", "iteration=2"]
+        )
@@ -1,173 +1,147 @@
 """Tests for issue_parser module."""
 
-import pytest
-import sys
-from pathlib import Path
+import os
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
 from lib.issue_parser import parse_issue, require_env, Issue
 
+# Canonical parse result shared by the equality tests
+EXPECTED = Issue(
+    number=42,
+    title="Fix the login bug",
+    body="The login form crashes on submit",
+)
+
+# Parsed once for the read-only label checks; Issue is frozen, so sharing is safe
+LABELLED = parse_issue("42", "Fix UI bug", "Button is broken", labels="frontend,bug")
+
 
 class TestParseIssue:
     """Tests for parse_issue()."""
 
     def test_valid_input(self):
-        result = parse_issue(
-            "42", "Fix the login bug", "The login form crashes on submit"
-        )
-        assert result == Issue(
-            number=42,
-            title="Fix the login bug",
-            body="The login form crashes on submit",
-        )
+        assert parse_issue(str(EXPECTED.number), EXPECTED.title, EXPECTED.body) == EXPECTED
 
     def test_strips_whitespace(self):
-        result = parse_issue("  42  ", "  Fix bug  ", "  Description  ")
-        assert result.number == 42
-        assert result.title == "Fix bug"
-        assert result.body == "Description"
-
-    def test_missing_number_raises(self):
-        with pytest.raises(ValueError, match="missing or empty"):
-            parse_issue("", "Title", "Body")
-
-    def test_none_number_raises(self):
-        with pytest.raises(ValueError, match="missing or empty"):
-            parse_issue(None, "Title", "Body")
-
-    def test_non_numeric_number_raises(self):
-        with pytest.raises(ValueError, match="positive integer"):
-            parse_issue("abc", "Title", "Body")
-
-    def test_negative_number_raises(self):
-        with pytest.raises(ValueError, match="positive integer"):
-            parse_issue("-1", "Title", "Body")
-
-    def test_zero_number_raises(self):
-        with pytest.raises(ValueError, match="positive integer"):
-            parse_issue("0", "Title", "Body")
-
-    def test_missing_title_raises(self):
-        with pytest.raises(ValueError, match="title"):
-            parse_issue("1", "", "Body")
-
-    def test_none_title_raises(self):
-        with pytest.raises(ValueError, match="title"):
-            parse_issue("1", None, "Body")
-
-    def test_whitespace_only_title_raises(self):
-        with pytest.raises(ValueError, match="title"):
-            parse_issue("1", "   ", "Body")
-
-    def test_missing_body_raises(self):
-        with pytest.raises(ValueError, match="body"):
-            parse_issue("1", "Title", "")
-
-    def test_none_body_raises(self):
-        with pytest.raises(ValueError, match="body"):
-            parse_issue("1", "Title", None)
-
-    def test_whitespace_only_body_raises(self):
-        with pytest.raises(ValueError, match="body"):
-            parse_issue("1", "Title", "   ")
+        result = parse_issue(
+            f"  {EXPECTED.number}  ", f"  {EXPECTED.title}  ", f"  {EXPECTED.body}  "
+        )
+        assert result == EXPECTED
+
+    @pytest.mark.parametrize(
+        "number, title, body, match",
+        [
+            ("", "Title", "Body", "missing or empty"),
+            (None, "Title", "Body", "missing or empty"),
+            ("abc", "Title", "Body", "positive integer"),
+            ("-1", "Title", "Body", "positive integer"),
+            ("0", "Title", "Body", "positive integer"),
+            ("1", "", "Body", "title"),
+            ("1", None, "Body", "title"),
+            ("1", "   ", "Body", "title"),
+            ("1", "Title", "", "body"),
+            ("1", "Title", None, "body"),
+            ("1", "Title", "   ", "body"),
+        ],
+        ids=[
+            "missing-number",
+            "none-number",
+            "non-numeric-number",
+            "negative-number",
+            "zero-number",
+            "missing-title",
+            "none-title",
+            "whitespace-title",
+            "missing-body",
+            "none-body",
+            "whitespace-body",
+        ],
+    )
+    def test_invalid_input_raises(self, number, title, body, match):
+        with pytest.raises(ValueError, match=match):
+            parse_issue(number, title, body)
 
     def test_issue_is_frozen(self):
-        issue = parse_issue("1", "Title", "Body")
         with pytest.raises(AttributeError):
-            issue.number = 2
+            EXPECTED.number = 2
 
 
 class TestIssueLabels:
     """Tests for labels field and is_frontend() on Issue."""
 
-    def test_labels_default_empty(self):
-        issue = parse_issue("1", "Title", "Body")
-        assert issue.labels == frozenset()
-
-    def test_labels_single(self):
-        issue = parse_issue("1", "Title", "Body", labels="frontend")
-        assert issue.labels == frozenset({"frontend"})
-
-    def test_labels_multiple(self):
-        issue = parse_issue("1", "Title", "Body", labels="frontend,bug,help wanted")
-        assert issue.labels == frozenset({"frontend", "bug", "help wanted"})
-
-    def test_labels_stripped_and_lowercased(self):
-        issue = parse_issue("1", "Title", "Body", labels="  Frontend  ,  BUG  ")
-        assert "frontend" in issue.labels
-        assert "bug" in issue.labels
-
-    def test_labels_empty_string(self):
-        issue = parse_issue("1", "Title", "Body", labels="")
-        assert issue.labels == frozenset()
-
-    def test_labels_whitespace_only_string(self):
-        issue = parse_issue("1", "Title", "Body", labels="   ,  ,  ")
-        assert issue.labels == frozenset()
-
-    def test_is_frontend_true(self):
-        issue = parse_issue("1", "Title", "Body", labels="frontend")
-        assert issue.is_frontend() is True
-
-    def test_is_frontend_true_case_insensitive_input(self):
-        issue = parse_issue("1", "Title", "Body", labels="Frontend")
-        assert issue.is_frontend() is True
-
-    def test_is_frontend_false_no_labels(self):
-        issue = parse_issue("1", "Title", "Body")
-        assert issue.is_frontend() is False
-
-    def test_is_frontend_false_other_labels(self):
-        issue = parse_issue("1", "Title", "Body", labels="bug,backend,performance")
-        assert issue.is_frontend() is False
-
-    def test_is_frontend_true_among_many_labels(self):
-        issue = parse_issue("1", "Title", "Body", labels="bug,frontend,help wanted")
-        assert issue.is_frontend() is True
+    @pytest.mark.parametrize(
+        "labels, expected, frontend",
+        [
+            (None, set(), False),
+            ("frontend", {"frontend"}, True),
+            ("frontend,bug,help wanted", {"frontend", "bug", "help wanted"}, True),
+            ("  Frontend  ,  BUG  ", {"frontend", "bug"}, True),
+            ("", set(), False),
+            ("   ,  ,  ", set(), False),
+            ("Frontend", {"frontend"}, True),
+            ("bug,backend,performance", {"bug", "backend", "performance"}, False),
+            ("bug,frontend,help wanted", {"bug", "frontend", "help wanted"}, True),
+        ],
+        ids=[
+            "default-empty",
+            "single",
+            "multiple",
+            "stripped-and-lowercased",
+            "empty-string",
+            "whitespace-only",
+            "case-insensitive-frontend",
+            "other-labels",
+            "frontend-among-many",
+        ],
+    )
+    def test_labels_parsed(self, labels, expected, frontend):
+        kwargs = {} if labels is None else {"labels": labels}
+        issue = parse_issue("1", "Title", "Body", **kwargs)
+        assert issue.labels == frozenset(expected)
+        assert issue.is_frontend() is frontend
 
     def test_valid_input_includes_labels(self):
-        issue = parse_issue(
-            "42", "Fix UI bug", "Button is broken", labels="frontend,bug"
-        )
-        assert issue.number == 42
-        assert issue.title == "Fix UI bug"
-        assert issue.body == "Button is broken"
-        assert "frontend" in issue.labels
-        assert "bug" in issue.labels
+        assert LABELLED.number == 42
+        assert LABELLED.title == "Fix UI bug"
+        assert LABELLED.body == "Button is broken"
+        assert LABELLED.labels == frozenset({"frontend", "bug"})
 
     def test_labels_field_is_frozenset(self):
-        issue = parse_issue("1", "Title", "Body", labels="frontend")
-        assert isinstance(issue.labels, frozenset)
+        assert isinstance(LABELLED.labels, frozenset)
 
     def test_labels_immutable_via_frozen_dataclass(self):
-        issue = parse_issue("1", "Title", "Body", labels="frontend")
         with pytest.raises(AttributeError):
-            issue.labels = frozenset({"other"})
+            LABELLED.labels = frozenset({"other"})
 
 
-class TestRequireEnv:
-    """Tests for require_env()."""
+@pytest.fixture
+def env_key():
+    """Yield an env var name that starts unset and is restored afterwards."""
+    key = "TEST_VAR_123"
+    orig = os.environ.pop(key, None)
+    yield key
+    os.environ.pop(key, None)
+    if orig is not None:
+        os.environ[key] = orig
 
-    def test_returns_value_when_set(self, monkeypatch):
-        monkeypatch.setenv("TEST_VAR_123", "hello")
-        assert require_env("TEST_VAR_123") == "hello"
 
-    def test_strips_whitespace(self, monkeypatch):
-        monkeypatch.setenv("TEST_VAR_123", "  hello  ")
-        assert require_env("TEST_VAR_123") == "hello"
-
-    def test_raises_when_missing(self, monkeypatch):
-        monkeypatch.delenv("TEST_MISSING_VAR_XYZ", raising=False)
-        with pytest.raises(ValueError, match="TEST_MISSING_VAR_XYZ"):
-            require_env("TEST_MISSING_VAR_XYZ")
-
-    def test_raises_when_empty(self, monkeypatch):
-        monkeypatch.setenv("TEST_VAR_123", "")
-        with pytest.raises(ValueError, match="TEST_VAR_123"):
-            require_env("TEST_VAR_123")
+class TestRequireEnv:
+    """Tests for require_env()."""
 
-    def test_raises_when_whitespace_only(self, monkeypatch):
-        monkeypatch.setenv("TEST_VAR_123", "   ")
-        with pytest.raises(ValueError, match="TEST_VAR_123"):
-            require_env("TEST_VAR_123")
+    def test_returns_value_when_set(self, env_key):
+        os.environ[env_key] = "hello"
+        assert require_env(env_key) == "hello"
+
+    def test_strips_whitespace(self, env_key):
+        os.environ[env_key] = "  hello  "
+        assert require_env(env_key) == "hello"
+
+    @pytest.mark.parametrize(
+        "value", [None, "", "   "], ids=["missing", "empty", "whitespace-only"]
+    )
+    def test_raises_when_unset_or_blank(self, env_key, value):
+        if value is not None:
+            os.environ[env_key] = value
+        with pytest.raises(ValueError, match=env_key):
+            require_env(env_key)
@@ -1,86 +1,88 @@
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
 from lib.logging_config import format_summary, format_review_summary
 
+_PR_URL = "https://github.com/org/repo/pull/99"
+# Longer than the 3000-char cap format_review_summary applies
+_LONG_OUTPUT = "x" * 4000
 
-class TestFormatSummary:
-    def test_started_status(self):
-        result = format_summary({"status": "started", "issue_number": 7})
-        assert "Ralph Agent" in result
-        assert "#7" in result
-        assert "working on" in result.lower()
-
-    def test_pr_created_with_tests_passing(self):
-        result = format_summary(
-            {
-                "status": "pr_created",
-                "issue_number": 7,
-                "pr_url": "https://github.com/org/repo/pull/99",
-                "tests_passed": True,
-                "coding_attempts": 2,
-            }
-        )
-        assert "https://github.com/org/repo/pull/99" in result
-        assert "passing" in result
-        assert "2" in result
-
-    def test_pr_created_with_tests_failing(self):
-        result = format_summary(
-            {
-                "status": "pr_created",
-                "issue_number": 7,
-                "pr_url": "https://github.com/org/repo/pull/99",
-                "tests_passed": False,
-                "coding_attempts": 3,
-            }
-        )
-        assert "partially passing" in result
-
-    def test_failed_status_includes_error(self):
-        result = format_summary(
-            {
-                "status": "failed",
-                "issue_number": 7,
-                "error": "Push rejected",
-            }
-        )
-        assert "failed" in result.lower()
-        assert "Push rejected" in result
-        assert "#7" in result
 
-    def test_unknown_status_shows_status_string(self):
-        result = format_summary({"status": "pending"})
-        assert "pending" in result
-
-    def test_missing_optional_fields_do_not_raise(self):
-        result = format_summary({"status": "pr_created"})
-        assert isinstance(result, str)
+class TestFormatSummary:
+    @pytest.mark.parametrize(
+        "details, present, absent",
+        [
+            (
+                {"status": "started", "issue_number": 7},
+                ["Ralph Agent", "#7", "working on"],
+                [],
+            ),
+            (
+                {
+                    "status": "pr_created",
+                    "issue_number": 7,
+                    "pr_url": _PR_URL,
+                    "tests_passed": True,
+                    "coding_attempts": 2,
+                },
+                [_PR_URL, "Tests: passing", "Coding attempts: 2"],
+                ["partially passing"],
+            ),
+            (
+                {
+                    "status": "pr_created",
+                    "issue_number": 7,
+                    "pr_url": _PR_URL,
+                    "tests_passed": False,
+                    "coding_attempts": 3,
+                },
+                ["partially passing"],
+                [],
+            ),
+            (
+                {"status": "failed", "issue_number": 7, "error": "Push rejected"},
+                ["failed", "Push rejected", "#7"],
+                [],
+            ),
+            ({"status": "pending"}, ["pending"], []),
+            # Optional fields missing: must not raise, defaults fill in
+            ({"status": "pr_created"}, ["partially passing"], ["Coding attempts"]),
+        ],
+        ids=[
+            "started",
+            "pr-created-tests-passing",
+            "pr-created-tests-failing",
+            "failed-includes-error",
+            "unknown-status",
+            "missing-optional-fields",
+        ],
+    )
+    def test_summary_contents(self, details, present, absent):
+        result = format_summary(details)
+        for text in present:
+            assert text in result
+        for text in absent:
+            assert text not in result
 
 
 class TestFormatReviewSummary:
-    def test_verdict_appears_in_header(self):
-        result = format_review_summary("Looks good.", "PASSED")
-        assert "PASSED" in result
-
-    def test_review_output_included(self):
-        result = format_review_summary("Change foo to bar.", "NEEDS ATTENTION")
-        assert "Change foo to bar." in result
+    @pytest.mark.parametrize(
+        "review_output, verdict",
+        [
+            ("Looks good.", "PASSED"),
+            ("Change foo to bar.", "NEEDS ATTENTION"),
+            ("Short review.", "PASSED"),
+        ],
+        ids=["passed", "needs-attention", "short-output"],
+    )
+    def test_short_output_included_whole(self, review_output, verdict):
+        result = format_review_summary(review_output, verdict)
+        assert f"Ralph Self-Review — {verdict}" in result
+        assert review_output in result
+        assert "truncated" not in result
+        # Automated footer
+        assert "Ralph Agent" in result
 
     def test_long_output_truncated(self):
-        long_output = "x" * 4000
-        result = format_review_summary(long_output, "PASSED")
+        result = format_review_summary(_LONG_OUTPUT, "PASSED")
         assert "truncated" in result
-        assert len(result) < len(long_output) + 200
-
-    def test_short_output_not_truncated(self):
-        short = "Short review."
-        result = format_review_summary(short, "PASSED")
-        assert "Short review." in result
-        assert "truncated" not in result
-
-    def test_contains_automated_footer(self):
-        result = format_review_summary("ok", "PASSED")
-        assert "Ralph Agent" in result
+        assert len(result) < len(_LONG_OUTPUT) + 200
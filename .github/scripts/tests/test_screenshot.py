@@ -1,8 +1,8 @@
-import sys
+import os
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import Mock, patch
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
 from lib.screenshot import (
     take_screenshot,
@@ -13,15 +13,31 @@ from lib.screenshot import (
     _parse_selected_paths,
     _fallback_screenshot_selection,
 )
-from lib.cline_runner import ClineError
+from lib.cline_runner import ClineError, ClineResult, ClineRunner
+
+# What a successful Cline run returns; take_screenshot only reads the file
+_SUCCESS = ClineResult(stdout="", stderr="", exit_code=0)
+
+# Stand-in screenshot contents: any non-empty file counts as a capture
+_PNG_BYTES = b"\x89PNG data"
+
+# Markdown embedding only looks at path strings; nothing here is on disk
+_SHOTS_DIR = Path("/repo/screenshots")
+
+
+@pytest.fixture
+def mock_cline():
+    """ClineRunner stand-in whose run() succeeds without writing anything."""
+    mock = Mock(spec=ClineRunner)
+    mock.run.return_value = _SUCCESS
+    return mock
 
 
 class TestTakeScreenshot:
     """Tests for take_screenshot()."""
 
-    def test_creates_parent_directory(self, tmp_path):
+    def test_creates_parent_directory(self, tmp_path, mock_cline):
         """Should create the parent directory for the screenshot."""
-        mock_cline = MagicMock()
         output_path = tmp_path / "subdir" / "screenshot.png"
 
         # Cline succeeds but doesn't actually create the file
@@ -29,49 +45,38 @@ class TestTakeScreenshot:
 
         assert output_path.parent.exists()
 
-    def test_returns_path_when_file_exists(self, tmp_path):
-        """Should return the path when screenshot is created successfully."""
+    @pytest.mark.parametrize(
+        "cline_run, expect_path",
+        [
+            (lambda out: out.write_bytes(_PNG_BYTES), True),
+            (ClineError("failed"), False),
+            (None, False),
+            (lambda out: out.write_bytes(b""), False),
+        ],
+        ids=["file-written", "cline-fails", "file-not-created", "file-empty"],
+    )
+    def test_result_depends_on_written_file(
+        self, tmp_path, mock_cline, cline_run, expect_path
+    ):
+        """Returns the path only for a non-empty file; never raises on Cline errors."""
         output_path = tmp_path / "screenshot.png"
-
-        mock_cline = MagicMock()
-
-        # Simulate Cline creating the file
-        def create_file(*args, **kwargs):
-            output_path.write_bytes(b"\x89PNG fake image data")
-            return MagicMock(success=True)
-
-        mock_cline.run.side_effect = create_file
+        if isinstance(cline_run, Exception):
+            mock_cline.run.side_effect = cline_run
+        elif cline_run is not None:
+            mock_cline.run.side_effect = lambda *a, **kw: cline_run(output_path)
 
         result = take_screenshot(mock_cline, output_path)
-        assert result == output_path
-
-    def test_returns_none_when_cline_fails(self, tmp_path):
-        """Should return None (not raise) when Cline fails."""
-        mock_cline = MagicMock()
-        mock_cline.run.side_effect = ClineError("failed")
-
-        output_path = tmp_path / "screenshot.png"
-        result = take_screenshot(mock_cline, output_path)
-        assert result is None
-
-    def test_returns_none_when_file_not_created(self, tmp_path):
-        """Should return None when Cline succeeds but file doesn't exist."""
-        mock_cline = MagicMock()
-        output_path = tmp_path / "screenshot.png"
-
-        result = take_screenshot(mock_cline, output_path)
-        assert result is None
+        assert result == (output_path if expect_path else None)
 
-    def test_adopts_misnamed_png_when_expected_file_missing(self, tmp_path):
+    def test_adopts_misnamed_png_when_expected_file_missing(self, tmp_path, mock_cline):
         """When expected file is missing but another PNG exists, should rename and return it."""
         output_path = tmp_path / "before.png"
 
         def save_differently(*args, **kwargs):
             # Cline saved to a different filename
-            (tmp_path / "switch.png").write_bytes(b"\x89PNG fake")
-            return MagicMock(success=True)
+            (tmp_path / "switch.png").write_bytes(_PNG_BYTES)
+            return _SUCCESS
 
-        mock_cline = MagicMock()
         mock_cline.run.side_effect = save_differently
 
         with patch("lib.screenshot.logger") as mock_logger:
@@ -83,24 +88,8 @@ class TestTakeScreenshot:
             warning_calls = " ".join(str(c) for c in mock_logger.warning.call_args_list)
             assert "switch.png" in warning_calls
 
-    def test_returns_none_when_file_empty(self, tmp_path):
-        """Should return None when screenshot file is 0 bytes."""
-        output_path = tmp_path / "screenshot.png"
-
-        mock_cline = MagicMock()
-
-        def create_empty(*args, **kwargs):
-            output_path.write_bytes(b"")
-            return MagicMock(success=True)
-
-        mock_cline.run.side_effect = create_empty
-
-        result = take_screenshot(mock_cline, output_path)
-        assert result is None
-
-    def test_prompt_includes_before_context(self, tmp_path):
+    def test_prompt_includes_before_context(self, tmp_path, mock_cline):
         """Should include 'BEFORE' context in the prompt sent to Cline."""
-        mock_cline = MagicMock()
         output_path = tmp_path / "screenshot.png"
 
         take_screenshot(mock_cline, output_path)
@@ -113,10 +102,10 @@ class TestTakeScreenshot:
 class TestEmbedScreenshotsMarkdown:
     """Tests for embed_screenshots_markdown()."""
 
-    def test_both_screenshots(self, tmp_path):
-        before = tmp_path / "screenshots" / "before.png"
-        after1 = tmp_path / "screenshots" / "after_01.png"
-        after2 = tmp_path / "screenshots" / "after_02.png"
+    def test_both_screenshots(self):
+        before = _SHOTS_DIR / "before.png"
+        after1 = _SHOTS_DIR / "after_01.png"
+        after2 = _SHOTS_DIR / "after_02.png"
 
         md = embed_screenshots_markdown(
             before, [after1, after2], "ralph/issue-1", "user/repo"
@@ -129,52 +118,55 @@ class TestEmbedScreenshotsMarkdown:
         assert "after_01.png" in md
         assert "after_02.png" in md
 
-    def test_multiple_after_labels(self, tmp_path):
-        after1 = tmp_path / "screenshots" / "after_01.png"
-        after2 = tmp_path / "screenshots" / "after_02.png"
+    def test_multiple_after_labels(self):
+        after1 = _SHOTS_DIR / "after_01.png"
+        after2 = _SHOTS_DIR / "after_02.png"
 
         md = embed_screenshots_markdown(None, [after1, after2], "branch", "user/repo")
 
         assert "After 1" in md
         assert "After 2" in md
 
-    def test_single_after_no_number_label(self, tmp_path):
-        after = tmp_path / "screenshots" / "after_01.png"
+    def test_single_after_no_number_label(self):
+        after = _SHOTS_DIR / "after_01.png"
 
         md = embed_screenshots_markdown(None, [after], "branch", "user/repo")
 
         assert "![After]" in md
         assert "After 1" not in md
 
-    def test_no_screenshots(self):
-        md = embed_screenshots_markdown(None, [], "branch", "user/repo")
-        assert "No screenshots" in md
-
-    def test_only_before(self, tmp_path):
-        before = tmp_path / "screenshots" / "before.png"
-        md = embed_screenshots_markdown(before, [], "branch", "user/repo")
-        assert "Before" in md
-        assert "After" not in md
-
-    def test_only_after(self, tmp_path):
-        after = tmp_path / "screenshots" / "after_01.png"
-        md = embed_screenshots_markdown(None, [after], "branch", "user/repo")
-        assert "After" in md
-        assert "Before" not in md
+    @pytest.mark.parametrize(
+        "with_before, with_after, present, absent",
+        [
+            (False, False, "No screenshots", "Before"),
+            (True, False, "Before", "After"),
+            (False, True, "After", "Before"),
+        ],
+        ids=["none", "only-before", "only-after"],
+    )
+    def test_sections_present(self, with_before, with_after, present, absent):
+        before = _SHOTS_DIR / "before.png" if with_before else None
+        after = [_SHOTS_DIR / "after_01.png"] if with_after else []
+        md = embed_screenshots_markdown(before, after, "branch", "user/repo")
+        assert present in md
+        assert absent not in md
 
 
 class TestToRelativePath:
-    def test_extracts_from_screenshots_dir(self):
-        path = Path("/home/user/project/screenshots/before.png")
-        assert _to_relative_path(path) == "screenshots/before.png"
-
-    def test_falls_back_to_filename(self):
-        path = Path("/home/user/project/images/before.png")
-        assert _to_relative_path(path) == "before.png"
-
-    def test_nested_screenshots_dir(self):
-        path = Path("/home/user/project/screenshots/subdir/after.png")
-        assert _to_relative_path(path) == "screenshots/subdir/after.png"
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/home/user/project/screenshots/before.png", "screenshots/before.png"),
+            ("/home/user/project/images/before.png", "before.png"),
+            (
+                "/home/user/project/screenshots/subdir/after.png",
+                "screenshots/subdir/after.png",
+            ),
+        ],
+        ids=["screenshots-dir", "falls-back-to-filename", "nested-screenshots-dir"],
+    )
+    def test_relative_path(self, path, expected):
+        assert _to_relative_path(Path(path)) == expected
 
 
 class TestRecoverMisnamedScreenshot:
@@ -186,7 +178,7 @@ class TestRecoverMisnamedScreenshot:
     def test_renames_most_recent_png_to_output_path(self, tmp_path):
         output_path = tmp_path / "before.png"
         other = tmp_path / "screenshot_random.png"
-        other.write_bytes(b"\x89PNG data")
+        other.write_bytes(_PNG_BYTES)
         result = _recover_misnamed_screenshot(output_path)
         assert result == output_path
         assert output_path.exists()
@@ -197,10 +189,10 @@ class TestRecoverMisnamedScreenshot:
         old = tmp_path / "old.png"
         new = tmp_path / "new.png"
         old.write_bytes(b"\x89PNG old")
-        import time
-
-        time.sleep(0.01)
         new.write_bytes(b"\x89PNG new")
+        # Explicit mtimes: ordering by write time breaks on coarse-mtime filesystems
+        os.utime(old, (1000, 1000))
+        os.utime(new, (2000, 2000))
         _recover_misnamed_screenshot(output_path)
         assert output_path.read_bytes() == b"\x89PNG new"
 
@@ -208,7 +200,7 @@ class TestRecoverMisnamedScreenshot:
 class TestValidateScreenshot:
     def test_returns_path_for_valid_file(self, tmp_path):
         p = tmp_path / "shot.png"
-        p.write_bytes(b"\x89PNG data")
+        p.write_bytes(_PNG_BYTES)
         assert _validate_screenshot(p) == p
 
     def test_returns_none_for_empty_file(self, tmp_path):
@@ -223,73 +215,70 @@ class TestValidateScreenshot:
     def test_recovers_misnamed_file(self, tmp_path):
         output_path = tmp_path / "before.png"
         other = tmp_path / "other.png"
-        other.write_bytes(b"\x89PNG data")
+        other.write_bytes(_PNG_BYTES)
         result = _validate_screenshot(output_path)
         assert result == output_path
         assert output_path.exists()
 
 
+@pytest.fixture
+def verdict_path(tmp_path):
+    """Where the visual reviewer writes its verdict; starts absent."""
+    return tmp_path / "visual_verdict.txt"
+
+
 class TestParseSelectedPaths:
-    def test_returns_empty_when_verdict_missing(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_returns_empty_when_verdict_missing(self, tmp_path, verdict_path):
         assert _parse_selected_paths(verdict_path, tmp_path) == []
 
-    def test_returns_empty_when_verdict_empty(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_returns_empty_when_verdict_empty(self, tmp_path, verdict_path):
         verdict_path.write_text("")
         assert _parse_selected_paths(verdict_path, tmp_path) == []
 
-    def test_returns_empty_when_no_selected_line(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_returns_empty_when_no_selected_line(self, tmp_path, verdict_path):
         verdict_path.write_text("VISUAL: OK\nNo selection here")
         assert _parse_selected_paths(verdict_path, tmp_path) == []
 
-    def test_parses_single_file(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_parses_single_file(self, tmp_path, verdict_path):
         img = tmp_path / "after_01.png"
-        img.write_bytes(b"\x89PNG")
+        img.write_bytes(_PNG_BYTES)
         verdict_path.write_text("VISUAL: OK\nSELECTED: after_01.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == [img]
 
-    def test_parses_multiple_comma_separated_files(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_parses_multiple_comma_separated_files(self, tmp_path, verdict_path):
         img1 = tmp_path / "after_01.png"
         img2 = tmp_path / "after_02.png"
-        img1.write_bytes(b"\x89PNG")
-        img2.write_bytes(b"\x89PNG")
+        img1.write_bytes(_PNG_BYTES)
+        img2.write_bytes(_PNG_BYTES)
         verdict_path.write_text("SELECTED: after_01.png, after_02.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == [img1, img2]
 
-    def test_skips_files_that_dont_exist(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_skips_files_that_dont_exist(self, tmp_path, verdict_path):
         img = tmp_path / "after_01.png"
-        img.write_bytes(b"\x89PNG")
+        img.write_bytes(_PNG_BYTES)
         verdict_path.write_text("SELECTED: after_01.png, ghost.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == [img]
 
-    def test_skips_empty_files(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_skips_empty_files(self, tmp_path, verdict_path):
         img = tmp_path / "after_01.png"
         img.write_bytes(b"")
         verdict_path.write_text("SELECTED: after_01.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == []
 
-    def test_case_insensitive_selected_keyword(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_case_insensitive_selected_keyword(self, tmp_path, verdict_path):
         img = tmp_path / "after_01.png"
-        img.write_bytes(b"\x89PNG")
+        img.write_bytes(_PNG_BYTES)
         verdict_path.write_text("selected: after_01.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == [img]
 
-    def test_inline_selected_on_same_line_as_visual(self, tmp_path):
-        verdict_path = tmp_path / "visual_verdict.txt"
+    def test_inline_selected_on_same_line_as_visual(self, tmp_path, verdict_path):
         img = tmp_path / "after_01.png"
-        img.write_bytes(b"\x89PNG")
+        img.write_bytes(_PNG_BYTES)
         verdict_path.write_text("VISUAL: OK SELECTED: after_01.png")
         result = _parse_selected_paths(verdict_path, tmp_path)
         assert result == [img]
@@ -299,20 +288,20 @@ class TestFallbackScreenshotSelection:
     def test_returns_after_pngs_sorted_by_name(self, tmp_path):
         b = tmp_path / "after_02.png"
         a = tmp_path / "after_01.png"
-        a.write_bytes(b"\x89PNG")
-        b.write_bytes(b"\x89PNG")
+        a.write_bytes(_PNG_BYTES)
+        b.write_bytes(_PNG_BYTES)
         result = _fallback_screenshot_selection(tmp_path)
         assert result == [a, b]
 
     def test_excludes_before_png(self, tmp_path):
         before = tmp_path / "before.png"
-        before.write_bytes(b"\x89PNG")
+        before.write_bytes(_PNG_BYTES)
         result = _fallback_screenshot_selection(tmp_path)
         assert result == []
 
     def test_falls_back_to_any_png_when_no_after_prefix(self, tmp_path):
         img = tmp_path / "screenshot_123.png"
-        img.write_bytes(b"\x89PNG")
+        img.write_bytes(_PNG_BYTES)
         result = _fallback_screenshot_selection(tmp_path)
         assert result == [img]
 
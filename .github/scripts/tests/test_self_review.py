@@ -1,46 +1,22 @@
-"""Tests for self_review — parse_verdict and frontend-gating behaviour.
-
-parse_verdict is extracted here to avoid importing the top-level self_review
-module (which pulls in lib.agent_config → pyyaml at import time and would fail
-in environments without the full dependency set installed).
-"""
+"""Tests for self_review — parse_verdict and frontend-gating behaviour."""
 
+import dataclasses
+import os
 import re
+import subprocess
 import sys
-from pathlib import Path
-from unittest.mock import MagicMock
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+import time
 
-# ── Inline copy of parse_verdict so we can test it without importing the full
-#    self_review module (which has heavy top-level imports).  The logic must
-#    stay in sync with the real implementation in self_review.py.
-def parse_verdict(review_output: str) -> str:
-    """Mirror of self_review.parse_verdict — kept in sync manually."""
-    clean_output = re.sub(r"[*_`>#\-]", " ", review_output)
+import pytest
 
-    for line in clean_output.splitlines():
-        line_stripped = line.strip().lower()
-        if "verdict" in line_stripped and ":" in line_stripped:
-            after_colon = line_stripped.split(":", 1)[1].strip()
-            if (
-                "needs changes" in after_colon
-                or "needs_changes" in after_colon
-                or "needs changes" in line_stripped
-            ):
-                return "NEEDS CHANGES"
-            if "lgtm" in after_colon:
-                return "LGTM"
+# self_review loads lib.agent_config, which needs pyyaml, at import time
+pytest.importorskip("yaml")
 
-    clean_lower = clean_output.lower()
-    if "needs changes" in clean_lower or "needs_changes" in clean_lower:
-        idx = clean_lower.find("needs changes")
-        if idx != -1 and "verdict" in clean_lower[max(0, idx - 100) : idx + 50]:
-            return "NEEDS CHANGES"
-
-    return "LGTM"
+from lib.cline_runner import ClineResult
+from lib.git_ops import get_diff
+from lib.issue_parser import parse_issue
+import self_review
+from self_review import _VISUAL_QA_HEADING, parse_verdict
 
 
 # ── parse_verdict ────────────────────────────────────────────────────────────
@@ -49,133 +25,602 @@ def parse_verdict(review_output: str) -> str:
 class TestParseVerdict:
     """Tests for parse_verdict()."""
 
-    def test_lgtm_simple(self):
-        assert parse_verdict("Verdict: LGTM") == "LGTM"
-
-    def test_needs_changes_simple(self):
-        assert parse_verdict("Verdict: NEEDS CHANGES") == "NEEDS CHANGES"
+    @pytest.mark.parametrize(
+        "review_output, expected",
+        [
+            ("Verdict: LGTM", "LGTM"),
+            ("Verdict: NEEDS CHANGES", "NEEDS CHANGES"),
+            ("**Verdict: LGTM**", "LGTM"),
+            ("**Verdict: NEEDS CHANGES**", "NEEDS CHANGES"),
+            ("> Verdict: LGTM", "LGTM"),
+            ("> Verdict: NEEDS CHANGES", "NEEDS CHANGES"),
+            ("Verdict: NEEDS_CHANGES", "NEEDS CHANGES"),
+            ("verdict: lgtm", "LGTM"),
+            ("verdict: needs changes", "NEEDS CHANGES"),
+            # Lenient: no clear verdict → LGTM
+            ("The code looks reasonable overall.", "LGTM"),
+            ("", "LGTM"),
+            (
+                "Overall looks okay.\n\nVerdict: NEEDS CHANGES\n\nPlease fix the tests.",
+                "NEEDS CHANGES",
+            ),
+            (
+                "## Review\n\n"
+                "The implementation is correct.\n"
+                "Tests pass.\n\n"
+                "Verdict: LGTM\n",
+                "LGTM",
+            ),
+            ("Verdict: **NEEDS CHANGES**", "NEEDS CHANGES"),
+            ("### Verdict:\nLGTM", "LGTM"),
+            ("Verdict: the patch still needs changes to the tests.", "NEEDS CHANGES"),
+            ("Verdict: LGTM\n\n(Not Verdict: NEEDS CHANGES)", "LGTM"),
+            ("---\n**Verdict: NEEDS CHANGES**\n---", "NEEDS CHANGES"),
+            ("Verdict: LGTM (though it needs changes later)", "NEEDS CHANGES"),
+            (
+                "Respond with Verdict: LGTM or Verdict: NEEDS CHANGES",
+                "NEEDS CHANGES",
+            ),
+            ("Verdict:\n\nLGTM but this needs changes", "NEEDS CHANGES"),
+            ("…needs changes … verdict: ok", "NEEDS CHANGES"),
+        ],
+        ids=[
+            "lgtm-simple",
+            "needs-changes-simple",
+            "lgtm-bold-markdown",
+            "needs-changes-bold-markdown",
+            "lgtm-in-blockquote",
+            "needs-changes-in-blockquote",
+            "needs-underscore-variant",
+            "case-insensitive-lgtm",
+            "case-insensitive-needs-changes",
+            "no-verdict-defaults-to-lgtm",
+            "empty-string-defaults-to-lgtm",
+            "needs-changes-in-longer-review",
+            "multiline-with-lgtm-verdict",
+            "bold-value-after-colon",
+            "verdict-value-on-next-line",
+            "phrased-needs-changes-near-verdict",
+            "first-verdict-wins",
+            "verdict-with-surrounding-noise",
+            "needs-changes-beats-lgtm-on-verdict-line",
+            "echoed-format-line",
+            "needs-changes-near-empty-verdict-line",
+            "needs-changes-before-colon",
+        ],
+    )
+    def test_parse_verdict(self, review_output, expected):
+        assert parse_verdict(review_output) == expected
+
+    @pytest.mark.parametrize("gap", range(25, 110))
+    def test_loose_scan_window_edges(self, gap):
+        # "verdict" must sit wholly within 100 chars before / 50 after
+        for text in (
+            "verdict" + " " * gap + "needs changes",
+            "needs changes" + " " * gap + "verdict",
+        ):
+            idx = text.find("needs changes")
+            near = "verdict" in text[max(0, idx - 100) : idx + 50]
+            assert parse_verdict(text) == ("NEEDS CHANGES" if near else "LGTM")
+
+    def test_loose_scan_window_is_exclusive_at_the_edges(self):
+        assert parse_verdict("verdict" + " " * 93 + "needs changes") == "NEEDS CHANGES"
+        assert parse_verdict("verdict" + " " * 94 + "needs changes") == "LGTM"
+        assert parse_verdict("needs changes" + " " * 30 + "verdict") == "NEEDS CHANGES"
+        assert parse_verdict("needs changes" + " " * 31 + "verdict") == "LGTM"
 
-    def test_lgtm_bold_markdown(self):
-        assert parse_verdict("**Verdict: LGTM**") == "LGTM"
 
-    def test_needs_changes_bold_markdown(self):
-        assert parse_verdict("**Verdict: NEEDS CHANGES**") == "NEEDS CHANGES"
+# ── Frontend-gating: visual verdict only read for frontend issues ─────────────
 
-    def test_lgtm_in_blockquote(self):
-        assert parse_verdict("> Verdict: LGTM") == "LGTM"
 
-    def test_needs_changes_in_blockquote(self):
-        assert parse_verdict("> Verdict: NEEDS CHANGES") == "NEEDS CHANGES"
+class _RecordingCall:
+    """Wraps read_visual_verdict, recording the paths it was given."""
 
-    def test_needs_underscore_variant(self):
-        assert parse_verdict("Verdict: NEEDS_CHANGES") == "NEEDS CHANGES"
+    def __init__(self, func):
+        self.func = func
+        self.calls = []
 
-    def test_case_insensitive_lgtm(self):
-        assert parse_verdict("verdict: lgtm") == "LGTM"
+    def __call__(self, path):
+        self.calls.append(path)
+        return self.func(path)
 
-    def test_case_insensitive_needs_changes(self):
-        assert parse_verdict("verdict: needs changes") == "NEEDS CHANGES"
 
-    def test_no_verdict_defaults_to_lgtm(self):
-        # Lenient: no clear verdict → LGTM
-        assert parse_verdict("The code looks reasonable overall.") == "LGTM"
+# Issues are read-only in these tests, so each label set is parsed once
+@pytest.fixture(scope="module")
+def frontend_issue():
+    return parse_issue("1", "Fix button colour", "Button is wrong", labels="frontend")
 
-    def test_empty_string_defaults_to_lgtm(self):
-        assert parse_verdict("") == "LGTM"
 
-    def test_needs_changes_beats_lgtm_when_only_needs_changes(self):
-        output = (
-            "Overall looks okay.\n\nVerdict: NEEDS CHANGES\n\nPlease fix the tests."
-        )
-        assert parse_verdict(output) == "NEEDS CHANGES"
+@pytest.fixture(scope="module")
+def backend_issue():
+    return parse_issue("2", "Fix API timeout", "Times out", labels="backend,bug")
 
-    def test_multiline_with_lgtm_verdict(self):
-        output = (
-            "## Review\n\n"
-            "The implementation is correct.\n"
-            "Tests pass.\n\n"
-            "Verdict: LGTM\n"
-        )
-        assert parse_verdict(output) == "LGTM"
 
-    def test_verdict_with_surrounding_noise(self):
-        output = "---\n**Verdict: NEEDS CHANGES**\n---"
-        assert parse_verdict(output) == "NEEDS CHANGES"
+@pytest.fixture(scope="module")
+def unlabelled_issue():
+    return parse_issue("3", "Some task", "Some description")
 
 
-# ── Frontend-gating: visual verdict only read for frontend issues ─────────────
+@pytest.fixture
+def shots_dir(tmp_path, monkeypatch):
+    """Point self_review at an empty screenshots dir, with a cold verdict cache."""
+    monkeypatch.setattr(self_review, "SCREENSHOTS_DIR", tmp_path)
+    self_review._cached_visual_verdict.cache_clear()
+    yield tmp_path
+    self_review._cached_visual_verdict.cache_clear()
 
 
-class TestVisualVerdictGating:
-    """
-    Tests that the is_frontend() gate correctly controls whether
-    read_visual_verdict would be called.  We test this by simulating
-    the exact conditional pattern used in self_review.py:
+@pytest.fixture
+def rvv(shots_dir, monkeypatch):
+    recorder = _RecordingCall(self_review.read_visual_verdict)
+    monkeypatch.setattr(self_review, "read_visual_verdict", recorder)
+    return recorder
 
-        visual_verdict = read_visual_verdict(path) if issue.is_frontend() else None
-    """
 
-    def _call_with_gate(self, issue, mock_rvv, path):
-        """Reproduce the gating expression from self_review.py."""
-        return mock_rvv(path) if issue.is_frontend() else None
+def _write_verdict(shots_dir, text, mtime_ns):
+    path = shots_dir / "visual_verdict.txt"
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
 
-    def _frontend_issue(self):
-        from lib.issue_parser import parse_issue
 
-        return parse_issue(
-            "1", "Fix button colour", "Button is wrong", labels="frontend"
+class TestVisualVerdictGating:
+    """Tests for _visual_verdict() and _visual_section()."""
+
+    def test_frontend_issue_reads_visual_verdict(self, frontend_issue, shots_dir, rvv):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        assert self_review._visual_verdict(frontend_issue) == "FEATURE_FOUND"
+        assert rvv.calls == [shots_dir]
+
+    def test_non_frontend_issue_skips_visual_verdict(
+        self, backend_issue, shots_dir, rvv
+    ):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        assert self_review._visual_verdict(backend_issue) is None
+        assert rvv.calls == []
+
+    def test_unlabelled_issue_skips_visual_verdict(
+        self, unlabelled_issue, shots_dir, rvv
+    ):
+        _write_verdict(shots_dir, "SOMETHING", 1_000_000_000)
+        assert self_review._visual_verdict(unlabelled_issue) is None
+        assert rvv.calls == []
+
+    def test_frontend_among_many_labels_still_triggers(self, shots_dir, rvv):
+        issue = parse_issue("4", "Title", "Body", labels="bug,frontend,ui")
+        _write_verdict(shots_dir, "OK", 1_000_000_000)
+        assert self_review._visual_verdict(issue) == "OK"
+        assert len(rvv.calls) == 1
+
+    def test_missing_verdict_file_is_none(self, frontend_issue, shots_dir, rvv):
+        assert self_review._visual_verdict(frontend_issue) is None
+        assert rvv.calls == []
+
+    def test_verdict_read_once_while_unchanged(self, frontend_issue, shots_dir, rvv):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        assert self_review._visual_verdict(frontend_issue) == "FEATURE_FOUND"
+        assert self_review._visual_verdict(frontend_issue) == "FEATURE_FOUND"
+        assert len(rvv.calls) == 1
+
+    def test_rewritten_verdict_is_reread(self, frontend_issue, shots_dir, rvv):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        assert self_review._visual_verdict(frontend_issue) == "FEATURE_FOUND"
+        _write_verdict(shots_dir, "FEATURE_MISSING", 2_000_000_000)
+        assert self_review._visual_verdict(frontend_issue) == "FEATURE_MISSING"
+        assert len(rvv.calls) == 2
+
+    def test_visual_section_omitted_when_verdict_none(self, frontend_issue, shots_dir):
+        assert self_review._visual_section(frontend_issue) == ""
+
+    def test_visual_section_omitted_for_non_frontend(self, backend_issue, shots_dir):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        assert self_review._visual_section(backend_issue) == ""
+
+    def test_visual_section_present_when_verdict_set(self, frontend_issue, shots_dir):
+        _write_verdict(shots_dir, "FEATURE_FOUND", 1_000_000_000)
+        section = self_review._visual_section(frontend_issue)
+        assert section == _VISUAL_QA_HEADING + "FEATURE_FOUND"
+
+
+# ── DiffCache: incremental refresh must match a full diff ────────────────────
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=str(repo),
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(repo, files):
+    """Write (or, for None, delete) ``files`` and commit them."""
+    for name, text in files.items():
+        path = repo / name
+        if text is None:
+            path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "change")
+
+
+def _lines(tag, n=20):
+    return "".join(f"{tag} line {i}\n" for i in range(n))
+
+
+class TestDiffCache:
+    """Tests for DiffCache against a real repository."""
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        _git(tmp_path, "init", "-q", "-b", "main")
+        _commit(
+            tmp_path,
+            {
+                "app.js": _lines("app"),
+                "old.js": _lines("old"),
+                "gone.js": _lines("gone"),
+                "é.txt": _lines("accent"),
+                'q"x.txt': _lines("quote"),
+                "sp ace b/x.txt": _lines("space"),
+            },
+        )
+        _git(tmp_path, "checkout", "-q", "-b", "feature")
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    @pytest.fixture
+    def diff_calls(self, monkeypatch):
+        """Record the paths each get_diff call was limited to."""
+        calls = []
+
+        def recording_get_diff(base, paths=None, max_bytes=None):
+            calls.append(paths)
+            return get_diff(base, paths=paths, max_bytes=max_bytes)
+
+        monkeypatch.setattr(self_review, "get_diff", recording_get_diff)
+        return calls
+
+    def test_quoted_paths_survive_full_refresh(self, repo):
+        _commit(
+            repo,
+            {
+                "é.txt": _lines("accent") + "more\n",
+                'q"x.txt': _lines("quote") + "more\n",
+                "sp ace b/x.txt": _lines("space") + "more\n",
+            },
+        )
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        assert cache.diff == get_diff("main")
+        assert cache.changed_files == ["q\"x.txt", "sp ace b/x.txt", "é.txt"]
+
+    def test_modify_refreshes_only_touched_files(self, repo, diff_calls):
+        _commit(repo, {"app.js": _lines("app") + "one\n", "é.txt": "new\n"})
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        _commit(repo, {"é.txt": "newer\n", "new.js": "added\n"})
+        cache.refresh()
+        assert cache.diff == get_diff("main")
+        assert diff_calls == [None, ["new.js", "é.txt"]]
+
+    def test_rename_matches_full_diff(self, repo):
+        _commit(repo, {"app.js": _lines("app") + "one\n"})
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        _commit(repo, {"old.js": None, "ñew.js": _lines("old")})
+        cache.refresh()
+        assert "rename to" in cache.diff
+        assert cache.diff == get_diff("main")
+        # And a later edit to the renamed file still sees the rename
+        _commit(repo, {"ñew.js": _lines("old") + "tail\n"})
+        cache.refresh()
+        assert cache.diff == get_diff("main")
+
+    def test_delete_matches_full_diff(self, repo):
+        _commit(repo, {"app.js": _lines("app") + "one\n"})
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        _commit(repo, {"gone.js": None})
+        cache.refresh()
+        assert "deleted file mode" in cache.diff
+        assert cache.diff == get_diff("main")
+        # A new file that pairs with the deleted one turns into a rename
+        _commit(repo, {"back.js": _lines("gone")})
+        cache.refresh()
+        assert cache.diff == get_diff("main")
+
+    def test_reverted_file_drops_out(self, repo):
+        _commit(repo, {"app.js": _lines("app") + "one\n", "é.txt": "new\n"})
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        _commit(repo, {"app.js": _lines("app")})
+        cache.refresh()
+        assert cache.diff == get_diff("main")
+        assert cache.changed_files == ["é.txt"]
+
+    def test_unchanged_head_skips_git_diff(self, repo, diff_calls):
+        _commit(repo, {"app.js": _lines("app") + "one\n"})
+        cache = self_review.DiffCache("main")
+        cache.refresh()
+        digest = cache.digest
+        cache.refresh()
+        assert diff_calls == [None]
+        assert cache.digest == digest
+
+
+# ── run_tests: streamed npm test with early stop and watchdog ─────────────────
+
+
+class TestRunTests:
+    """run_tests() against a real child process standing in for npm."""
+
+    @pytest.fixture
+    def npm_test(self, monkeypatch):
+        real_popen = subprocess.Popen
+
+        def make(script: str, timeout: float = 30) -> None:
+            def fake_popen(cmd, **kwargs):
+                return real_popen([sys.executable, "-c", script], **kwargs)
+
+            monkeypatch.setattr(subprocess, "Popen", fake_popen)
+            cfg = self_review._cfg
+            timeouts = dataclasses.replace(cfg.timeouts, test_seconds=timeout)
+            monkeypatch.setattr(
+                self_review, "_cfg", dataclasses.replace(cfg, timeouts=timeouts)
+            )
+
+        return make
+
+    def test_passing_run(self, npm_test):
+        npm_test("print('PASS a.test.js'); print('Tests: 3 passed')")
+        assert self_review.run_tests() == (True, "PASS a.test.js\nTests: 3 passed\n")
+
+    def test_failing_exit_code(self, npm_test):
+        npm_test("import sys; print('Error: no tests'); sys.exit(1)")
+        assert self_review.run_tests() == (False, "Error: no tests\n")
+
+    def test_stops_after_failure_context(self, npm_test, monkeypatch):
+        monkeypatch.setattr(self_review, "TEST_FAIL_CONTEXT_LINES", 5)
+        npm_test(
+            "import time; print('PASS a.test.js'); print('FAIL b.test.js');"
+            " [print(f'detail {i}', flush=True) for i in range(50)]; time.sleep(30)"
+        )
+        start = time.monotonic()
+        success, output = self_review.run_tests()
+        assert time.monotonic() - start < 5
+        assert success is False
+        assert output.splitlines() == [
+            "PASS a.test.js",
+            "FAIL b.test.js",
+            *(f"detail {i}" for i in range(5)),
+        ]
+
+    def test_stopped_early_counts_as_failure(self, npm_test, monkeypatch):
+        # Even if npm manages to exit 0 before it is killed
+        monkeypatch.setattr(self_review, "TEST_FAIL_CONTEXT_LINES", 1)
+        npm_test("print('FAIL b.test.js'); print('detail'); print('more')")
+        success, _ = self_review.run_tests()
+        assert success is False
+
+    def test_output_keeps_last_lines(self, npm_test, monkeypatch):
+        monkeypatch.setattr(self_review, "TEST_OUTPUT_MAX_LINES", 10)
+        npm_test("[print(f'line {i}') for i in range(100)]")
+        success, output = self_review.run_tests()
+        assert success is True
+        assert output.splitlines() == [f"line {i}" for i in range(90, 100)]
+
+    def test_watchdog_times_out(self, npm_test):
+        npm_test("import time; print('starting', flush=True); time.sleep(30)", 0.3)
+        start = time.monotonic()
+        assert self_review.run_tests() == (False, "Tests timed out after 0.3s")
+        assert time.monotonic() - start < 5
+
+
+# ── _run_review_iteration: verdict from the reviewer's output ────────────────
+
+
+class _StubDiffCache:
+    diff = "diff --git a/app.js b/app.js\n+fix\n"
+    changed_files = ["app.js"]
+
+    def refresh(self):
+        pass
+
+
+class _StubReviewer:
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def run(self, prompt, timeout, cwd, marker=None):
+        # Same capture ClineRunner does: the first stdout line matching marker
+        lines = self.stdout.splitlines()
+        marked = [line for line in lines if marker and re.search(marker, line, re.I)]
+        return ClineResult(
+            stdout=self.stdout,
+            stderr="",
+            exit_code=0,
+            marker_line=marked[0] if marked else None,
         )
 
-    def _backend_issue(self):
-        from lib.issue_parser import parse_issue
-
-        return parse_issue("2", "Fix API timeout", "Times out", labels="backend,bug")
-
-    def _unlabelled_issue(self):
-        from lib.issue_parser import parse_issue
-
-        return parse_issue("3", "Some task", "Some description")
-
-    def test_frontend_issue_reads_visual_verdict(self, tmp_path):
-        mock_rvv = MagicMock(return_value="FEATURE_FOUND")
-        result = self._call_with_gate(self._frontend_issue(), mock_rvv, tmp_path)
-        mock_rvv.assert_called_once_with(tmp_path)
-        assert result == "FEATURE_FOUND"
-
-    def test_non_frontend_issue_skips_visual_verdict(self, tmp_path):
-        mock_rvv = MagicMock(return_value="FEATURE_FOUND")
-        result = self._call_with_gate(self._backend_issue(), mock_rvv, tmp_path)
-        mock_rvv.assert_not_called()
-        assert result is None
-
-    def test_unlabelled_issue_skips_visual_verdict(self, tmp_path):
-        mock_rvv = MagicMock(return_value="SOMETHING")
-        result = self._call_with_gate(self._unlabelled_issue(), mock_rvv, tmp_path)
-        mock_rvv.assert_not_called()
-        assert result is None
-
-    def test_frontend_among_many_labels_still_triggers(self, tmp_path):
-        from lib.issue_parser import parse_issue
 
-        issue = parse_issue("4", "Title", "Body", labels="bug,frontend,ui")
-        mock_rvv = MagicMock(return_value="OK")
-        result = self._call_with_gate(issue, mock_rvv, tmp_path)
-        mock_rvv.assert_called_once()
-        assert result == "OK"
-
-    def test_visual_section_omitted_when_verdict_none(self):
-        """When visual_verdict is None the visual_section string should be empty."""
-        visual_verdict = None
-        visual_section = (
-            f"\n\n### Visual QA\n{visual_verdict}" if visual_verdict else ""
+class TestRunReviewIteration:
+    def test_earlier_needs_changes_beats_later_lgtm_line(self, backend_issue):
+        output = (
+            "Verdict: the patch still needs changes before merge.\n"
+            "**Verdict:** LGTM\n"
+        )
+        reviewer = _StubReviewer(output)
+        verdict, review_output = self_review._run_review_iteration(
+            reviewer, backend_issue, _StubDiffCache()
         )
-        assert visual_section == ""
+        assert verdict == "NEEDS CHANGES" == parse_verdict(output)
+        assert review_output == output
 
-    def test_visual_section_present_when_verdict_set(self):
-        """When visual_verdict is a string the visual_section should contain it."""
-        visual_verdict = "FEATURE_FOUND"
-        visual_section = (
-            f"\n\n### Visual QA\n{visual_verdict}" if visual_verdict else ""
+    def test_well_formed_verdict_line(self, backend_issue):
+        reviewer = _StubReviewer("Looks fine.\n**Verdict:** LGTM\n")
+        verdict, _ = self_review._run_review_iteration(
+            reviewer, backend_issue, _StubDiffCache()
         )
-        assert "FEATURE_FOUND" in visual_section
-        assert "Visual QA" in visual_section
+        assert verdict == "LGTM"
+
+
+# ── main: iteration handoff between workflow runs ─────────────────────────────
+
+
+class _FakeDiffCache:
+    """DiffCache stand-in whose diff changes on every refresh (each fix lands)."""
+
+    def __init__(self, base):
+        self.digest = b""
+        self.changed_files = ["app.js"]
+
+    def refresh(self):
+        self.digest += b"."
+
+
+class _FakeRunner:
+    def reset_task_state(self):
+        pass
+
+
+class TestMainIterations:
+    """main() with REVIEW_ITERATION / REVIEW_DISPATCH_WORKFLOW, Cline faked out."""
+
+    @pytest.fixture
+    def review(self, monkeypatch):
+        for key, value in {
+            "ISSUE_NUMBER": "7",
+            "ISSUE_TITLE": "Fix it",
+            "ISSUE_BODY": "Broken",
+            "ISSUE_LABELS": "backend",
+            "PR_NUMBER": "12",
+            "BRANCH": "ralph/issue-7",
+            "OPENROUTER_API_KEY": "sk-test",
+            "SCREENSHOTS_RUN_ID": "99",
+        }.items():
+            monkeypatch.setenv(key, value)
+        monkeypatch.delenv("REVIEW_ITERATION", raising=False)
+        monkeypatch.delenv("REVIEW_DISPATCH_WORKFLOW", raising=False)
+        monkeypatch.setattr(self_review, "MAX_REVIEW_ITERATIONS", 3)
+
+        state = {"verdicts": [], "reviews": 0, "fixes": [], "dispatched": []}
+        state["labels"], state["comments"] = [], []
+
+        def run_review_iteration(reviewer, issue, diff_cache):
+            state["reviews"] += 1
+            verdict = state["verdicts"].pop(0)
+            return verdict, f"Verdict: {verdict}"
+
+        def apply_review_fixes(fixer, iteration, issue, review_output):
+            state["fixes"].append(iteration)
+            return True
+
+        def dispatch_workflow(workflow, inputs):
+            if state.get("dispatch_error"):
+                raise self_review.GitError("dispatch refused")
+            state["dispatched"].append((workflow, inputs))
+
+        fakes = {
+            "setup_logging": lambda verbose=False: None,
+            "get_openrouter_usage": lambda fresh=False: None,
+            "DiffCache": _FakeDiffCache,
+            "_make_reviewer": _FakeRunner,
+            "_make_fixer": _FakeRunner,
+            "_run_review_iteration": run_review_iteration,
+            "_apply_review_fixes": apply_review_fixes,
+            "_push_fixes": lambda iteration, branch: True,
+            "dispatch_workflow": dispatch_workflow,
+            "_safe_label_pr": lambda pr, label: state["labels"].append(label),
+            "_safe_post_pr_comment": lambda pr, body: state["comments"].append(body),
+        }
+        for name, fake in fakes.items():
+            monkeypatch.setattr(self_review, name, fake)
+        return state
+
+    def test_runs_all_iterations_in_process_without_dispatch(self, review):
+        review["verdicts"] = ["NEEDS CHANGES", "LGTM"]
+        self_review.main()
+        assert review["reviews"] == 2
+        assert review["fixes"] == [1]
+        assert review["labels"] == ["review-passed"]
+
+    def test_diff_refreshed_only_after_push(self, review, monkeypatch):
+        events = []
+
+        def push_fixes(iteration, branch):
+            time.sleep(0.05)
+            events.append("pushed")
+            return True
+
+        class RecordingDiffCache(_FakeDiffCache):
+            def refresh(self):
+                events.append("refresh")
+                super().refresh()
+
+        monkeypatch.setattr(self_review, "_push_fixes", push_fixes)
+        monkeypatch.setattr(self_review, "DiffCache", RecordingDiffCache)
+        review["verdicts"] = ["NEEDS CHANGES", "LGTM"]
+        self_review.main()
+        # A rebase during the push must land before the next diff is read
+        assert events[events.index("pushed") :] == ["pushed", "refresh"]
+
+    def test_hands_next_iteration_to_workflow(self, review, monkeypatch):
+        monkeypatch.setenv("REVIEW_DISPATCH_WORKFLOW", "ralph-self-review.yml")
+        review["verdicts"] = ["NEEDS CHANGES"]
+        self_review.main()
+        assert review["reviews"] == 1
+        assert review["fixes"] == [1]
+        assert review["dispatched"] == [
+            (
+                "ralph-self-review.yml",
+                {
+                    "issue_number": "7",
+                    "pr_number": "12",
+                    "branch": "ralph/issue-7",
+                    "issue_labels": "backend",
+                    "iteration": "2",
+                    "screenshots_run_id": "99",
+                },
+            )
+        ]
+        # The dispatched run reports the verdict, not this one
+        assert review["labels"] == []
+        assert review["comments"] == []
+
+    def test_failed_dispatch_continues_in_process(self, review, monkeypatch):
+        monkeypatch.setenv("REVIEW_DISPATCH_WORKFLOW", "ralph-self-review.yml")
+        review["dispatch_error"] = True
+        review["verdicts"] = ["NEEDS CHANGES", "LGTM"]
+        self_review.main()
+        assert review["reviews"] == 2
+        assert review["labels"] == ["review-passed"]
+
+    def test_resumes_at_review_iteration(self, review, monkeypatch):
+        monkeypatch.setenv("REVIEW_ITERATION", "2")
+        review["verdicts"] = ["NEEDS CHANGES", "NEEDS CHANGES"]
+        self_review.main()
+        # Iterations 2 and 3 only; the last one gets no fix round
+        assert review["reviews"] == 2
+        assert review["fixes"] == [2]
+        assert review["labels"] == ["review-needs-attention"]
+
+    def test_last_iteration_never_dispatches(self, review, monkeypatch):
+        monkeypatch.setenv("REVIEW_ITERATION", "3")
+        monkeypatch.setenv("REVIEW_DISPATCH_WORKFLOW", "ralph-self-review.yml")
+        review["verdicts"] = ["NEEDS CHANGES"]
+        self_review.main()
+        assert review["fixes"] == []
+        assert review["dispatched"] == []
+        assert review["labels"] == ["review-needs-attention"]
+
+    @pytest.mark.parametrize("iteration", ["0", "4"])
+    def test_out_of_range_review_iteration_rejected(
+        self, review, monkeypatch, iteration
+    ):
+        monkeypatch.setenv("REVIEW_ITERATION", iteration)
+        with pytest.raises(ValueError, match="REVIEW_ITERATION"):
+            self_review.main()
+        assert review["reviews"] == 0
@@ -1,11 +1,22 @@
+import http.client
+import http.server
+import os
+import socket
+import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+from lib import utils
 from lib.utils import (
+    _read_capped,
+    _run_install,
+    _server_ready,
+    get_git_diff,
+    get_repo_name,
     load_prompt_template,
     screenshot_relative_path,
     read_visual_verdict,
@@ -49,6 +60,20 @@ class TestLoadPromptTemplate:
         result = load_prompt_template(tmp_path, "prompt.md", X="yes")
         assert result == "yes and yes"
 
+    def test_literal_braces_preserved(self, tmp_path):
+        (tmp_path / "prompt.md").write_text('{"id": {{ID}}} {other}', encoding="utf-8")
+        result = load_prompt_template(tmp_path, "prompt.md", ID="7")
+        assert result == '{"id": 7} {other}'
+
+    def test_rereads_template_after_edit(self, tmp_path):
+        path = tmp_path / "prompt.md"
+        path.write_text("old {{X}}", encoding="utf-8")
+        assert load_prompt_template(tmp_path, "prompt.md", X="1") == "old 1"
+        path.write_text("new {{X}}", encoding="utf-8")
+        mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        assert load_prompt_template(tmp_path, "prompt.md", X="2") == "new 2"
+
 
 class TestScreenshotRelativePath:
     def test_extracts_from_screenshots_dir(self):
@@ -89,3 +114,122 @@ class TestReadVisualVerdict:
         )
         result = read_visual_verdict(tmp_path)
         assert result == "VISUAL: OK"
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=str(repo),
+        check=True,
+        capture_output=True,
+    )
+
+
+class TestGetGitDiff:
+    def _repo(self, tmp_path):
+        _git(tmp_path, "init", "-q")
+        (tmp_path / "a.txt").write_text("one\n", encoding="utf-8")
+        _git(tmp_path, "add", "a.txt")
+        _git(tmp_path, "commit", "-q", "-m", "init")
+        return tmp_path
+
+    def test_returns_diff_of_tracked_changes(self, tmp_path):
+        repo = self._repo(tmp_path)
+        (repo / "a.txt").write_text("two\n", encoding="utf-8")
+        diff = get_git_diff(repo)
+        assert diff.startswith("diff --git")
+        assert "+two" in diff
+
+    def test_falls_back_to_status_for_untracked_files(self, tmp_path):
+        repo = self._repo(tmp_path)
+        (repo / "new.txt").write_text("x\n", encoding="utf-8")
+        assert get_git_diff(repo) == "?? new.txt"
+
+    def test_empty_when_worktree_clean(self, tmp_path):
+        assert get_git_diff(self._repo(tmp_path)) == ""
+
+    def test_output_capped_at_max_bytes(self, tmp_path):
+        repo = self._repo(tmp_path)
+        (repo / "a.txt").write_text("line\n" * 10000, encoding="utf-8")
+        diff = get_git_diff(repo, max_bytes=500)
+        assert diff.startswith("diff --git")
+        assert len(diff) <= 500
+
+    def test_stalled_command_times_out(self, tmp_path):
+        cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+        with pytest.raises(subprocess.TimeoutExpired):
+            _read_capped(cmd, tmp_path, max_bytes=500, timeout=0.2)
+
+
+class TestGetRepoName:
+    def test_uses_github_repository_without_forking(self, monkeypatch):
+        monkeypatch.setenv("GITHUB_REPOSITORY", "octo/widgets")
+        monkeypatch.setattr(subprocess, "run", None)
+        assert get_repo_name() == "octo/widgets"
+
+
+class TestServerReady:
+    def test_false_when_nothing_listening(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        assert _server_ready(conn) is False
+
+    def test_true_on_200(self):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=1)
+            assert _server_ready(conn) is True
+            # Same connection is reusable for the next probe
+            assert _server_ready(conn) is True
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestRunInstall:
+    def test_success(self, tmp_path):
+        _run_install([sys.executable, "-c", "print('added 2 packages')"], str(tmp_path))
+
+    def test_failure_raises_with_merged_output(self, tmp_path):
+        cmd = [
+            sys.executable,
+            "-c",
+            "import sys; print('fetching'); sys.stderr.write('ERR!\\n'); sys.exit(1)",
+        ]
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            _run_install(cmd, str(tmp_path))
+        assert exc_info.value.returncode == 1
+        assert "fetching" in exc_info.value.output
+        assert "ERR!" in exc_info.value.output
+
+    def test_idle_install_killed_with_output_tail(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(utils, "_INSTALL_IDLE_TIMEOUT", 0.5)
+        # The grandchild sleeps too: the whole process group must go down
+        cmd = [
+            sys.executable,
+            "-c",
+            "import subprocess, sys, time;"
+            " print('fetching lodash', flush=True);"
+            " subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']);"
+            " time.sleep(30)",
+        ]
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired) as exc_info:
+            _run_install(cmd, str(tmp_path))
+        assert time.monotonic() - start < 5
+        assert "fetching lodash" in exc_info.value.output